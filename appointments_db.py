@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Manage the SQLite appointment store
+
+Import a schedule (appointments.json format, or CSV with profile, date,
+time and type columns) in one transaction, list upcoming appointments,
+or export a profile back to appointments.json format.
+
+Usage: python3 appointments_db.py DB import FILE [--profile NAME] [--replace]
+       python3 appointments_db.py DB next PROFILE [-n N] [--today YYYY-MM-DD]
+       python3 appointments_db.py DB export PROFILE OUT.json
+       python3 appointments_db.py DB profiles
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from datetime import date
+
+from pregnancy_tracker.appointment_store import AppointmentStore
+
+
+def read_rows(path):
+    if path.lower().endswith('.csv'):
+        with open(path, newline='') as f:
+            return list(csv.DictReader(f))
+    with open(path) as f:
+        data = json.load(f)
+    return data.get('appointments', []) if isinstance(data, dict) else data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('db', help='store file, e.g. practice.db')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    importer = commands.add_parser('import', help='insert or update appointments from a file')
+    importer.add_argument('file', help='.json or .csv')
+    importer.add_argument('--profile', help='profile for rows without a profile column')
+    importer.add_argument('--replace', action='store_true',
+                          help="drop the imported profiles' other appointments")
+
+    upcoming = commands.add_parser('next', help='show upcoming appointments')
+    upcoming.add_argument('profile')
+    upcoming.add_argument('-n', type=int, default=5)
+    upcoming.add_argument('--today', type=date.fromisoformat, default=date.today())
+
+    exporter = commands.add_parser('export', help='write a profile as appointments.json')
+    exporter.add_argument('profile')
+    exporter.add_argument('out')
+
+    commands.add_parser('profiles', help='list profiles with appointments')
+    args = parser.parse_args()
+    if args.command != 'import' and not os.path.exists(args.db):
+        parser.error(f"{args.db} doesn't exist yet; import a schedule into it first")
+
+    # Only an import creates the store or changes it
+    with AppointmentStore(args.db, readonly=args.command != 'import') as store:
+        if args.command == 'import':
+            rows = read_rows(args.file)
+            start = time.perf_counter()
+            stored, skipped = store.upsert(rows, profile=args.profile, replace=args.replace)
+            print(f"Stored {stored} appointments in {time.perf_counter() - start:.2f}s")
+            for row in skipped[:20]:
+                print(f"SKIPPED {row!r}")
+            if skipped:
+                print(f"{len(skipped)} rows skipped: each needs a profile, a YYYY-MM-DD date, a time and a type")
+                return 1
+        elif args.command == 'next':
+            for appt in store.next_appointments(args.profile, args.today, args.n):
+                print(f"{appt['date']}  {appt['time']:>8}  {appt['type']}")
+        elif args.command == 'export':
+            store.export_json(args.profile, args.out)
+            print(f"Wrote {len(store.appointments(args.profile))} appointments to {args.out}")
+        else:
+            for name in store.profiles():
+                print(name)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
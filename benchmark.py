@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Benchmark page rendering and report timings and peak memory
+
+Usage: python3 benchmark.py [--renders N] [--low-memory] [--display]
+"""
+
+import argparse
+import resource
+import time
+import tracemalloc
+
+from pregnancy_tracker import ScreenUI
+from pregnancy_tracker.cache import configure_caches, cache_stats, clear_caches
+from pregnancy_tracker.config import load_config
+from pregnancy_tracker.fonts import TEXT_RENDERERS, use_text_renderer
+from pregnancy_tracker.display import SimulatedEPD, REFRESH_MODES
+
+PAGE_NAMES = ["Progress", "Size Comparison", "Appointments", "Milestones"]
+
+
+def peak_rss_kb():
+    """Peak resident set size of this process (kB on Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def bench_page(screen_ui, page_num, renders):
+    screen_ui.set_page(page_num)
+    clear_caches()
+    start = time.perf_counter()
+    screen_ui.draw()
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(renders):
+        screen_ui.draw()
+    warm = (time.perf_counter() - start) / renders
+    return cold, warm
+
+
+def bench_display(screen_ui):
+    """Render + refresh cost per page and refresh mode on the simulated panel"""
+    print("")
+    print("Simulated panel (render time measured, transfer and refresh modelled):")
+    for mode in REFRESH_MODES:
+        epd = SimulatedEPD()
+        epd.init()
+        render_time = 0.0
+        for page_num in range(len(PAGE_NAMES)):
+            screen_ui.set_page(page_num)
+            start = time.perf_counter()
+            buffer = epd.getbuffer(screen_ui.draw())
+            render_time += time.perf_counter() - start
+            epd.display(buffer, mode)
+        pages = len(PAGE_NAMES)
+        panel_time = sum(frame.duration for frame in epd.frames)
+        print(f"  {mode:<8} render {render_time/pages*1000:6.2f} ms  panel {panel_time/pages*1000:7.1f} ms"
+              f"  per page, ghosting after {pages} refreshes: {epd.ghosting}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--renders', type=int, default=50, help='warm renders per page')
+    parser.add_argument('--low-memory', action='store_true', help='use the low-memory cache budgets')
+    parser.add_argument('--display', action='store_true', help='also model panel refresh costs')
+    parser.add_argument('--text-renderer', choices=TEXT_RENDERERS, help='override config.json')
+    args = parser.parse_args()
+
+    config = load_config('config.json', fallback=False)
+    low_memory = args.low_memory or config.low_memory
+    configure_caches(low_memory, config.raw.get('cache_budgets'))
+    text_renderer = use_text_renderer(args.text_renderer or config.text_renderer, config.glyph_atlas)
+
+    tracemalloc.start()
+    pregnancy = config.profiles[0].create_pregnancy()
+    screen_ui = ScreenUI(264, 176, pregnancy)
+
+    print(f"Low-memory mode: {'on' if low_memory else 'off'}, text renderer: {text_renderer}")
+    for page_num, page_name in enumerate(PAGE_NAMES):
+        cold, warm = bench_page(screen_ui, page_num, args.renders)
+        print(f"Page {page_num} {page_name:<16} cold {cold*1000:7.2f} ms   warm {warm*1000:7.2f} ms")
+
+    if args.display:
+        bench_display(screen_ui)
+
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print("")
+    print(f"Python heap: current {current/1024:.1f} kB, peak {peak/1024:.1f} kB (tracemalloc)")
+    print(f"Peak RSS: {peak_rss_kb()} kB")
+    for name, stats in sorted(cache_stats().items()):
+        print(f"  cache {name:<8} {stats['entries']:3d} entries {stats['bytes']/1024:8.1f} / "
+              f"{stats['max_bytes']/1024:.0f} kB  hits {stats['hits']} misses {stats['misses']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Build the glyph atlas used by the "atlas" text renderer
+
+Rasterizes every character the pages can show at every font size the
+layouts use, writes res/fonts/Merriweather-Black.atlas, then renders the
+golden pages, every glyph on its own and a batch of random strings with
+both renderers and fails unless they match pixel for pixel. Rebuild after upgrading
+Pillow or FreeType; the tracker ignores an atlas from another version.
+
+Usage: python3 build_glyph_atlas.py [--size WIDTHxHEIGHT ...] [--no-check]
+"""
+
+import argparse
+import math
+import os
+import random
+import string
+import sys
+import time
+
+from PIL import Image, ImageDraw
+
+from pregnancy_tracker.cache import configure_caches
+from pregnancy_tracker.developmental_milestones import (
+    MILESTONES, EARLY_MILESTONE, POST_TERM_MILESTONE)
+from pregnancy_tracker.fonts import (
+    create_font, font_file_path, default_atlas_path, get_font, use_text_renderer)
+from pregnancy_tracker.glyph_atlas import write_atlas
+from pregnancy_tracker.gray_scale import BLACK, DARK_GRAY, LIGHT_GRAY, WHITE
+from pregnancy_tracker.layout import get_layout
+from pregnancy_tracker.panel import PANEL_SIZES
+from pregnancy_tracker.size_data import PREGNANCY_SIZES
+from tests import golden
+
+# Appointment text is typed by hand, so cover all of printable ASCII
+BASE_CHARS = string.ascii_letters + string.digits + string.punctuation + ' •'
+
+# Blank pixels kept around the text when checking it
+CELL_MARGIN = 2
+
+# Sizes that only ever show numbers; the big ones dominate the atlas size
+NUMERIC_FIELDS = {
+    'percent_pt': string.digits + '.%',
+    'weekday_pt': string.digits + 'wd ',
+    'week_num_pt': string.digits,
+}
+
+
+def page_chars():
+    """Every character in the built-in page text"""
+    chars = set(BASE_CHARS)
+    for milestone in list(MILESTONES.values()) + [EARLY_MILESTONE, POST_TERM_MILESTONE]:
+        for text in milestone.values():
+            chars.update(text)
+    for comparison, length in PREGNANCY_SIZES.values():
+        chars.update(comparison.upper() + comparison + length)
+    return ''.join(sorted(chars))
+
+
+def layout_charsets(sizes, chars):
+    """Characters needed at each point size the layouts use for these panel sizes"""
+    charsets = {}
+    for width, height in sizes:
+        layout = get_layout(width, height)
+        fields = [(name, getattr(layout, name)) for name in layout.__slots__ if name.endswith('_pt')]
+        fields += [('size_pts', pt) for pt in layout.size_pts]
+        for name, pt in fields:
+            charsets.setdefault(pt, set()).update(NUMERIC_FIELDS.get(name, chars))
+    return {pt: ''.join(sorted(needed)) for pt, needed in charsets.items()}
+
+
+def render_pages():
+    return {golden.case_name(*case): golden.render(*case).tobytes()
+            for case in golden.cases()}
+
+
+def text_cell(pt, text, xy):
+    """Position and image size that hold all of text's ink, so no part is clipped.
+
+    The box comes from FreeType, and it covers descenders and any ink
+    left of or above the origin, so a clipped glyph can't match by accident.
+    """
+    left, top, right, bottom = create_font(pt).getbbox(text, 'L')
+    x, y = xy[0] - min(0, left), xy[1] - min(0, top)
+    return (x, y), (math.ceil(x + right) + CELL_MARGIN, math.ceil(y + bottom) + CELL_MARGIN)
+
+
+def render_text(font, pt, text, xy, background, fill):
+    xy, size = text_cell(pt, text, xy)
+    image = Image.new('L', size, background)
+    font.draw(ImageDraw.Draw(image), xy, text, fill)
+    return ((pt, text, xy), font.text_size(text), image.tobytes())
+
+
+def render_glyphs(charsets):
+    """Every glyph of the atlas on its own, in a cell as tall and wide as its box"""
+    return [render_text(get_font(pt), pt, ch, (0, 0), WHITE, BLACK)
+            for pt, chars in sorted(charsets.items()) for ch in chars]
+
+
+def render_strings(charsets, samples, seed=1):
+    rng = random.Random(seed)
+    frames = []
+    for pt, chars in sorted(charsets.items()):
+        font = get_font(pt)
+        for _ in range(samples):
+            text = ''.join(rng.choice(chars) for _ in range(rng.randint(1, 24)))
+            xy = (rng.choice((rng.uniform(0, 40), rng.randint(0, 40), rng.randint(0, 40) + 0.5)),
+                  rng.choice((rng.uniform(0, 30), rng.randint(0, 30), rng.randint(0, 30) + 0.5)))
+            frames.append(render_text(font, pt, text, xy, rng.choice((WHITE, LIGHT_GRAY)),
+                                      rng.choice((BLACK, DARK_GRAY))))
+    return frames
+
+
+def check(out, charsets, samples):
+    """Render with FreeType and the atlas; return the number of mismatches"""
+    configure_caches(budgets={'pages': 0})  # every page must really be drawn
+    use_text_renderer('freetype')
+    expected_pages = render_pages()
+    expected_glyphs = render_glyphs(charsets)
+    expected_strings = render_strings(charsets, samples)
+    if use_text_renderer('atlas', out) != 'atlas':
+        print("Could not load the new atlas")
+        return 1
+
+    start = time.perf_counter()
+    actual_pages = render_pages()
+    failures = [name for name, frame in actual_pages.items() if frame != expected_pages[name]]
+    actual_glyphs = render_glyphs(charsets)
+    actual_strings = render_strings(charsets, samples)
+    for expected, actual in zip(expected_glyphs + expected_strings, actual_glyphs + actual_strings):
+        if expected[1:] != actual[1:]:
+            failures.append("string %r at %r, %dpt" % (expected[0][1], expected[0][2], expected[0][0]))
+    elapsed = time.perf_counter() - start
+
+    for failure in failures[:20]:
+        print(f"MISMATCH {failure}")
+    print(f"Compared {len(actual_pages)} pages, {len(actual_glyphs)} glyphs and {len(actual_strings)} strings "
+          f"in {elapsed:.2f}s, {len(failures)} differ from FreeType")
+    return len(failures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', action='append', default=[],
+                        help='extra panel size in landscape, e.g. 400x300 (repeatable)')
+    parser.add_argument('--out', default=default_atlas_path)
+    parser.add_argument('--samples', type=int, default=200, help='random strings checked per font size')
+    parser.add_argument('--no-check', action='store_true', help='skip the pixel comparison')
+    args = parser.parse_args()
+
+    sizes = set(golden.SIZES)
+    sizes.update((height, width) for width, height in PANEL_SIZES.values())
+    sizes.update(tuple(int(v) for v in size.lower().split('x')) for size in args.size)
+
+    charsets = layout_charsets(sorted(sizes), page_chars())
+    # Built beside the old atlas, which the tracker keeps using unless the new one passes
+    root, ext = os.path.splitext(args.out)
+    new_path = f"{root}.new{ext}"
+    nbytes = write_atlas(new_path, font_file_path, charsets)
+    glyphs = sum(len(chars) for chars in charsets.values())
+    print(f"Built {glyphs} glyphs at {len(charsets)} sizes "
+          f"({', '.join(map(str, sorted(charsets)))} pt), {nbytes / 1024:.0f} kB")
+
+    if not args.no_check and check(new_path, charsets, args.samples):
+        os.remove(new_path)
+        print(f"Left {args.out} unchanged")
+        return 1
+    os.replace(new_path, args.out)
+    print(f"Wrote {args.out}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
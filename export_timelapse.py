@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""Export a time-lapse of one page over the whole pregnancy
+
+Renders the page for every day (or hour) from conception to the due date
+and streams the frames into an animated GIF, an animated WebP, or a
+directory of numbered PNGs. Frames are rendered in a process pool a few
+batches ahead of the writer and come back in order, so memory stays flat
+however long the export is.
+
+Consecutive frames share most of their pixels, and the writer uses that.
+Repeated frames only lengthen the previous frame's duration, and GIF and
+WebP frames store just the rectangle that changed on top of the frame
+before.
+The workers' page cache is keyed on page content, so a day that looks
+like the previous one isn't drawn again either.
+
+Usage: python3 export_timelapse.py [--page N] [--step day|hour] [--size WIDTHxHEIGHT]
+                                   [--fps N] [--jobs N] [--max-frames N] [--out timelapse.gif|.webp|DIR]
+"""
+
+import argparse
+import io
+import math
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from PIL import GifImagePlugin, Image, ImageChops
+
+from pregnancy_tracker import Pregnancy, ScreenUI
+from pregnancy_tracker.cache import configure_caches
+from pregnancy_tracker.config import load_config
+from pregnancy_tracker.fanout import warm_shared_caches
+from pregnancy_tracker.fonts import use_text_renderer
+from pregnancy_tracker.logs import setup_logging
+
+STEPS = {'day': timedelta(days=1), 'hour': timedelta(hours=1)}
+BATCH = 16  # frames per pool task
+
+# Per worker process: (pregnancy clock holder, ScreenUI)
+_worker = {}
+
+
+def render_batch(birth_date, appointments, page, size, times):
+    """Render page at each datetime in times; returns the raw 'L' frames"""
+    if 'ui' not in _worker:
+        now = _worker['now'] = [None]
+        pregnancy = Pregnancy(birth_date, clock=lambda: now[0])
+        _worker['ui'] = ScreenUI(size[0], size[1], pregnancy, current_page=page, appointments=appointments)
+    frames = []
+    for moment in times:
+        _worker['now'][0] = moment
+        frames.append(_worker['ui'].draw().tobytes())
+    return frames
+
+
+def frame_times(pregnancy, step):
+    """Datetimes from conception to the due date; daily frames are taken at noon"""
+    moment = pregnancy.pregnancy_start_date
+    if step >= STEPS['day']:
+        moment += timedelta(hours=12)
+    while moment <= pregnancy.birth_date:
+        yield moment
+        moment += step
+
+
+def batches(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def render_frames(pool, times, args, jobs):
+    """Frames in order, rendered by the pool with a bounded number of batches in flight"""
+    pending = deque()
+    for batch in batches(times, BATCH):
+        pending.append(pool.submit(render_batch, *args, batch))
+        if len(pending) >= jobs * 2:
+            yield from pending.popleft().result()
+    while pending:
+        yield from pending.popleft().result()
+
+
+class GifWriter:
+    """Streams frames into a GIF, holding back one frame to merge repeats"""
+
+    def __init__(self, path):
+        self.fp = open(path, 'wb')
+        self.previous = None
+        self.pending = None  # (image, offset, duration) not yet written
+
+    def add(self, image, duration):
+        if self.previous is None:
+            # getheader() may rewrite the image it is given
+            header, _ = GifImagePlugin.getheader(image.copy(), info={'loop': 0, 'duration': duration})
+            self.fp.write(b''.join(header))
+            self.pending = [image, (0, 0), duration]
+        else:
+            box = ImageChops.difference(self.previous, image).getbbox()
+            if box is None:
+                self.pending[2] += duration
+                return
+            self._write_pending()
+            self.pending = [image.crop(box), box[:2], duration]
+        self.previous = image
+
+    def _write_pending(self):
+        image, offset, duration = self.pending
+        # disposal 1: keep the previous frame underneath the changed rectangle
+        self.fp.write(b''.join(GifImagePlugin.getdata(image, offset, duration=duration, disposal=1)))
+
+    def close(self):
+        if self.pending:
+            self._write_pending()
+        self.fp.write(b';')
+        self.fp.close()
+
+
+def _uint24(value):
+    return value.to_bytes(3, 'little')
+
+
+def _write_chunk(fp, fourcc, payload):
+    fp.write(fourcc + len(payload).to_bytes(4, 'little') + payload)
+    if len(payload) % 2:
+        fp.write(b'\0')
+
+
+def _bitstream_chunks(data):
+    """The image chunks of a still WebP file, as they go inside an ANMF chunk"""
+    chunks = []
+    pos = 12  # past 'RIFF', size and 'WEBP'
+    while pos < len(data):
+        fourcc, size = data[pos:pos + 4], int.from_bytes(data[pos + 4:pos + 8], 'little')
+        end = pos + 8 + size + size % 2
+        if fourcc in (b'ALPH', b'VP8 ', b'VP8L'):
+            chunks.append(data[pos:end])
+        pos = end
+    return b''.join(chunks)
+
+
+class WebPWriter:
+    """Streams frames into an animated WebP, one ANMF chunk per distinct frame.
+
+    Works like GifWriter: each frame holds only the rectangle that changed
+    and is written once the next distinct frame arrives, so repeats only
+    lengthen its duration. The RIFF size is filled in by close().
+    """
+
+    def __init__(self, path):
+        self.fp = open(path, 'wb')
+        self.previous = None
+        self.pending = None  # (image, offset, duration) not yet written
+
+    def add(self, image, duration):
+        if self.previous is None:
+            self.fp.write(b'RIFF\0\0\0\0WEBP')
+            width, height = image.size
+            # Animation flag; canvas size
+            _write_chunk(self.fp, b'VP8X', bytes([0x02, 0, 0, 0]) + _uint24(width - 1) + _uint24(height - 1))
+            # White background, loop forever
+            _write_chunk(self.fp, b'ANIM', b'\xff\xff\xff\xff' + bytes(2))
+            self.pending = [image, (0, 0), duration]
+        else:
+            box = ImageChops.difference(self.previous, image).getbbox()
+            if box is None:
+                self.pending[2] += duration
+                return
+            self._write_pending()
+            # Frame offsets are stored halved, so start the rectangle on even pixels
+            box = (box[0] & ~1, box[1] & ~1, box[2], box[3])
+            self.pending = [image.crop(box), box[:2], duration]
+        self.previous = image
+
+    def _write_pending(self):
+        image, (x, y), duration = self.pending
+        still = io.BytesIO()
+        image.convert('RGB').save(still, 'WEBP', lossless=True)
+        header = (_uint24(x // 2) + _uint24(y // 2) + _uint24(image.width - 1) + _uint24(image.height - 1) +
+                  _uint24(min(duration, 0xFFFFFF)) + bytes([0x02]))  # no blending, keep the frame underneath
+        _write_chunk(self.fp, b'ANMF', header + _bitstream_chunks(still.getvalue()))
+
+    def close(self):
+        if self.pending:
+            self._write_pending()
+        size = self.fp.tell() - 8
+        self.fp.seek(4)
+        self.fp.write(size.to_bytes(4, 'little'))
+        self.fp.close()
+
+
+class SequenceWriter:
+    """One PNG per frame, so the frame rate stays exact for video tools"""
+
+    def __init__(self, path):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.count = 0
+
+    def add(self, image, duration):
+        image.save(os.path.join(self.path, f'frame_{self.count:05d}.png'))
+        self.count += 1
+
+    def close(self):
+        pass
+
+
+def create_writer(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.gif':
+        return GifWriter(path)
+    if ext == '.webp':
+        return WebPWriter(path)
+    return SequenceWriter(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--page', type=int, default=0, choices=range(4),
+                        help='0 progress, 1 size, 2 appointments, 3 milestones')
+    parser.add_argument('--step', choices=STEPS, default='day', help='time between frames')
+    parser.add_argument('--size', default='264x176', help='panel size in landscape, e.g. 400x300')
+    parser.add_argument('--fps', type=float, default=10)
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--max-frames', type=int,
+                        help='use a longer step if the export would have more frames')
+    parser.add_argument('--out', default='timelapse.gif',
+                        help='.gif or .webp file, or a directory for a PNG sequence')
+    args = parser.parse_args()
+    size = tuple(int(v) for v in args.size.lower().split('x'))
+
+    setup_logging('WARNING')
+    config = load_config('config.json', fallback=False)
+    configure_caches(config.low_memory, config.cache_budgets)
+    use_text_renderer(config.text_renderer, config.glyph_atlas)
+    profile = config.profiles[0]
+    pregnancy = profile.create_pregnancy()
+    appointments = ScreenUI(size[0], size[1], pregnancy, appointments_path=profile.appointments_path).appointments
+
+    step = STEPS[args.step]
+    frames = (pregnancy.birth_date - pregnancy.pregnancy_start_date) // step + 1
+    if args.max_frames and frames > args.max_frames:
+        step *= math.ceil(frames / args.max_frames)
+        print(f"Warning: {frames} frames is more than --max-frames {args.max_frames}, "
+              f"taking one frame every {step} instead", file=sys.stderr)
+
+    # Load fonts and icons once; forked workers share them
+    warm_shared_caches([size])
+    method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else None
+    duration = round(1000 / args.fps)
+    writer = create_writer(args.out)
+    start = time.perf_counter()
+    count = 0
+    with ProcessPoolExecutor(args.jobs, mp_context=multiprocessing.get_context(method)) as pool:
+        task = (profile.expected_birth_date, appointments, args.page, size)
+        for data in render_frames(pool, frame_times(pregnancy, step), task, args.jobs):
+            writer.add(Image.frombytes('L', size, data), duration)
+            count += 1
+    writer.close()
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {count} frames to {args.out} in {elapsed:.2f}s ({count / elapsed:.0f} frames/s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,118 +4,276 @@
 Main script with sequential GPIO initialization
 Initializes display first, then buttons to avoid conflicts
 """
-import json
 import os
+import tempfile
 import time
 import logging
 import signal
 import sys
 
-# Set logging to only show warnings and errors, not info messages
-logging.basicConfig(level=logging.WARNING)
+from pregnancy_tracker.logs import setup_logging, event, dump, DEFAULT_LEVEL
+from pregnancy_tracker.config import load_config, ConfigWatcher
+from pregnancy_tracker.state import StateStore
+from pregnancy_tracker.profiling import Profiler
 
-# Load config first
+# One logging pipeline, shared with tracker_with_updates.py when it imports us.
+# Started before the config is read so its problems are logged too.
+logs = setup_logging()
+
+# A broken config.json falls back to the last good one
 config_file_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'config.json')
-config = json.load(open(config_file_path))
+config = load_config(config_file_path)
+setup_logging(config.log_level)
+
+# Current page, last frame and cache manifest, kept across restarts
+cache_dir = os.path.join(os.path.dirname(config_file_path), 'cache')
+state = StateStore(os.path.join(cache_dir, 'state.json'))
+
+# `kill -USR1 <pid>` or touching this file profiles the next few renders
+profiler = Profiler(config.profile_dir, config.profiling)
+profile_flag_path = os.path.join(cache_dir, 'profile.request')
 
 # Global variables
 epd = None
 button_handler = None
 screen_ui = None
 pregnancy = None
+fanout = None
+power = None
+watcher = None
 
-def cleanup_and_exit(signum=None, frame=None):
-    """Clean up resources and exit"""
-    global epd, button_handler
+def cleanup_and_exit(signum=None, frame=None, clean=True):
+    """Clean up resources and exit; clean=False after a crash, so the next start knows"""
+    global button_handler, fanout
+    
+    if fanout:
+        try:
+            fanout.stop()
+        except Exception:
+            logging.warning("Fan-out shutdown failed", exc_info=True)
     
     if button_handler:
         try:
             button_handler.cleanup()
-        except:
-            pass
+        except Exception:
+            logging.warning("Button cleanup failed", exc_info=True)
     
-    if epd:
+    if power:
         try:
-            epd.sleep()
-        except:
-            pass
+            # The panel already sleeps between refreshes; only sleep it if it was left awake
+            power.sleep()
+        except Exception:
+            logging.warning("Display sleep failed", exc_info=True)
+    
+    save_state()
+    state.flush(clean_shutdown=clean)
+    profiler.finish()
+    logs.stop()
+    sys.exit(0 if clean else 1)
+
+def dump_logs(signum=None, frame=None):
+    """Write the recent log ring buffer out, e.g. `kill -USR2 <pid>`"""
+    path = config.log_dump_path or os.path.join(tempfile.gettempdir(), 'pregnancy-tracker-log.jsonl')
+    try:
+        count = dump(path)
+        event('log_dump', path=path, records=count)
+    except OSError as e:
+        event('log_dump_failed', level=logging.ERROR, path=path, error=str(e))
+
+def request_profile(signum=None, frame=None):
+    """Profile the next renders, e.g. `kill -USR1 <pid>`"""
+    profiler.request()
+
+def load_day_index(profile, pregnancy, appointments):
+    """Per-day page content, memory-mapped from the last run when nothing changed"""
+    from pregnancy_tracker.day_index import DayIndex
+    path = os.path.join(cache_dir, f'day_index-{profile.name}.bin')
+    index = DayIndex.load_or_build(pregnancy, appointments, path)
+    state.record_cache(f'day_index-{profile.name}', path, index.key.hex())
+    return index
+
+def save_state():
+    """Note the page on screen; written out in batches by the state store"""
+    if fanout:
+        state.update(page=fanout.current_page)
+    elif screen_ui and power:
+        state.update(page=screen_ui.current_page, frame_digest=power.last_digest)
+
+def setup_buttons():
+    """Start listening to the HAT buttons, if there is a GPIO library"""
+    global button_handler
+    try:
+        # Import RPi.GPIO directly to avoid conflicts
+        import RPi.GPIO as GPIO
+        from pregnancy_tracker.buttons import ButtonInput
+        button_handler = ButtonInput(GPIO, config.button_pins, config.button_debounce)
+    except ImportError:
+        # RPi.GPIO not available - running without buttons
+        pass
+    except Exception as e:
+        event('buttons_failed', level=logging.ERROR, error=str(e), exc_info=True)
+
+def apply_config(old, new, changed):
+    """Apply an edited config.json, redoing only what the change affects"""
+    global config, pregnancy
+    config = new
+    
+    if 'log_level' in changed:
+        logs.set_level(new.log_level or DEFAULT_LEVEL)
+    if changed & {'low_memory', 'cache_budgets'}:
+        from pregnancy_tracker.cache import configure_caches
+        configure_caches(new.low_memory, new.cache_budgets)
+    if changed & {'text_renderer', 'glyph_atlas'}:
+        # Both renderers draw the same pixels, so cached pages stay valid
+        from pregnancy_tracker.fonts import use_text_renderer
+        use_text_renderer(new.text_renderer, new.glyph_atlas)
     
-    sys.exit(0)
+    # Which panels and processes run is decided at startup
+    new_model = new.displays[new.profiles[0].display]['model']
+    old_model = old.displays[old.profiles[0].display]['model']
+    if (fanout and changed & {'profiles', 'expected_birth_date', 'displays'}) or \
+            (not fanout and (len(new.profiles) > 1 or len(new.displays) > 1 or new_model != old_model)):
+        # systemd restarts us with the new layout
+        event('config_restart', changed=sorted(changed))
+        cleanup_and_exit()
+    if fanout:
+        if 'power' in changed:
+            for worker in fanout.workers:
+                worker.power.settings = dict(new.power)
+        return
+    
+    if changed & {'expected_birth_date', 'profiles'}:
+        profile = new.profiles[0]
+        pregnancy = profile.create_pregnancy()
+        screen_ui.pregnancy = pregnancy
+        screen_ui.reload_appointments(profile.appointments_path)
+        screen_ui.day_index = load_day_index(profile, pregnancy, screen_ui.appointments)
+        # Pages are cached by their content, so stale ones are never hit
+        power.next_refresh_at = pregnancy.clock()
+    if 'power' in changed:
+        power.settings = dict(new.power)
+    if 'profiling' in changed:
+        profiler.settings = dict(new.profiling)
+        profiler.out_dir = new.profile_dir
+    if 'buttons' in changed and button_handler:
+        button_handler.cleanup()
+        setup_buttons()
 
 def update_display(page_num):
     """Update display to specified page"""
-    global epd, screen_ui
+    global fanout, power
+    
+    if fanout:
+        fanout.show_page(page_num)
+    else:
+        power.request(page_num)
+
+def wait_and_refresh():
+    """Sleep until a button press, the next scheduled change or a config check, then draw"""
+    timeout = power.idle_window() if power else 60
+    timeout = min(timeout, watcher.next_poll_in())
+    if state.next_flush_in() is not None:
+        timeout = min(timeout, state.next_flush_in())
+    if button_handler:
+        page = button_handler.get(timeout=timeout)
+        if page is not None:
+            # Batch every press that arrived while we were busy
+            for page_num in [page] + button_handler.drain():
+                update_display(page_num)
+    else:
+        time.sleep(timeout)
+    
+    try:
+        watcher.poll()
+    except Exception as e:
+        event('config_apply_failed', level=logging.ERROR, error=str(e), exc_info=True)
     
     try:
-        screen_ui.set_page(page_num)
-        himage = screen_ui.draw()
-        epd.display(epd.getbuffer(himage))
+        profiler.check_flag(profile_flag_path)
+        profiler.poll()
     except Exception as e:
-        logging.error(f"Display update error: {e}")
+        event('profile_failed', level=logging.ERROR, error=str(e), exc_info=True)
+    if power and power.has_work():
+        try:
+            with profiler.capture():
+                power.flush()
+        except Exception as e:
+            event('display_error', level=logging.ERROR, error=str(e), exc_info=True)
+    
+    save_state()
+    state.maybe_flush()
 
 # Register signal handlers
 signal.signal(signal.SIGINT, cleanup_and_exit)
 signal.signal(signal.SIGTERM, cleanup_and_exit)
+signal.signal(signal.SIGUSR2, dump_logs)
+signal.signal(signal.SIGUSR1, request_profile)
 
 try:
-    # Step 1: Initialize display FIRST
-    from waveshare_epd import epd2in7_V2
-    epd = epd2in7_V2.EPD()
-    epd.init()
-    epd.Clear()
-    
-    # Step 2: Setup pregnancy tracker and UI
-    from pregnancy_tracker import ScreenUI, Pregnancy
-    pregnancy = Pregnancy(config['expected_birth_date'])
-    screen_ui = ScreenUI(epd.height, epd.width, pregnancy, current_page=0)
+    from pregnancy_tracker.cache import configure_caches
+    from pregnancy_tracker.fonts import use_text_renderer
+    configure_caches(config.low_memory, config.cache_budgets)
+    use_text_renderer(config.text_renderer, config.glyph_atlas)
+    profiles = config.profiles
+    displays = config.displays
     
-    # Step 3: Show initial screen
-    himage = screen_ui.draw()
-    epd.display(epd.getbuffer(himage))
+    stale = state.check_caches()
+    if stale:
+        event('cache_stale', caches=stale)
+    page = state.get('page', 0)
+    if page not in range(4):
+        page = 0
     
-    # Step 4: Now try to initialize buttons AFTER display is set up
-    try:
-        # Import RPi.GPIO directly to avoid conflicts
-        import RPi.GPIO as GPIO
-        
-        # Setup GPIO mode
-        GPIO.setmode(GPIO.BCM)
-        GPIO.setwarnings(False)
-        
-        # Button pins
-        buttons = {1: 5, 2: 6, 3: 13, 4: 19}
+    if len(profiles) > 1 or len(displays) > 1:
+        # Several pregnancies and/or panels: render in a pool, one thread per display
+        from pregnancy_tracker.fanout import FanOut
+        fanout = FanOut(profiles, displays, config.power)
+        # Renders happen in the pool's processes, where the profiler can't see them
+        profiler.unsupported = 'fan-out mode renders in worker processes'
+        fanout.start()
+        if page:
+            fanout.show_page(page)
+    else:
+        # Step 1: Initialize display FIRST
+        from pregnancy_tracker.display import create_backend
+        model = displays[profiles[0].display]['model']
+        epd = create_backend(model)
         
-        # Setup buttons
-        for btn, pin in buttons.items():
-            GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+        # Step 2: Setup pregnancy tracker and UI
+        from pregnancy_tracker import ScreenUI
+        pregnancy = profiles[0].create_pregnancy()
+        screen_ui = ScreenUI(epd.height, epd.width, pregnancy, current_page=page,
+                             appointments_path=profiles[0].appointments_path)
+        screen_ui.day_index = load_day_index(profiles[0], pregnancy, screen_ui.appointments)
         
-        # Simple polling loop
-        button_states = {btn: 1 for btn in buttons}
-        last_press_time = 0
-        
-        while True:
-            for btn, pin in buttons.items():
-                current = GPIO.input(pin)
-                # Button pressed (LOW)
-                if current == 0 and button_states[btn] == 1:
-                    current_time = time.time()
-                    if current_time - last_press_time > 1:  # 1 second debounce
-                        last_press_time = current_time
-                        update_display(btn - 1)
-                button_states[btn] = current
-            time.sleep(0.05)
-            
-    except ImportError:
-        # RPi.GPIO not available - running without buttons
-        while True:
-            time.sleep(1)
-    except Exception as e:
-        logging.error(f"Button initialization failed: {e}")
-        while True:
-            time.sleep(1)
+        # Step 3: Show initial screen, then let the panel sleep between refreshes
+        from pregnancy_tracker.power import PowerManager
+        power = PowerManager(epd, screen_ui, config.power)
+        # A digest from another panel says nothing about what this one shows
+        same_panel = state.get('panel') == model and state.get('frame_digest')
+        if state.resumed_clean and same_panel:
+            # E-paper keeps its image: only refresh if the frame has changed since
+            power.last_digest = state.get('frame_digest')
+            power.request(page)
+            power.flush()
+        elif same_panel:
+            # After a crash a refresh may have been cut short, so redraw, but no clear needed
+            power.flush(force=True)
+        else:
+            power.clear()
+            power.flush(force=True)
+        state.update(panel=model)
+        save_state()
+    
+    # Step 4: Now try to initialize buttons AFTER display is set up
+    setup_buttons()
+    
+    # Step 5: Pick up config.json edits without a restart
+    watcher = ConfigWatcher(config, apply_config)
+    
+    while True:
+        wait_and_refresh()
 
 except Exception as e:
-    logging.error(f"Fatal error: {e}")
-    import traceback
-    traceback.print_exc()
-    cleanup_and_exit()
\ No newline at end of file
+    event('fatal', level=logging.CRITICAL, error=str(e), exc_info=True)
+    cleanup_and_exit(clean=False)
@@ -0,0 +1,161 @@
+"""Appointments in a local SQLite database, for many pregnancies at once.
+
+appointments.json suits one household. A practice importing its whole
+schedule puts it in a database instead, one row per appointment, tagged
+with the profile it belongs to:
+
+    store = AppointmentStore('practice.db')
+    store.upsert(rows)                  # one transaction, however many rows
+    store.next_appointments('twin-a', date.today(), limit=3)
+    store.export_json('twin-a', 'appointments-twin-a.json')
+
+A profile's (profile, date, time) identifies an appointment, so
+importing the same schedule twice updates rows instead of duplicating
+them. Rows are indexed on (profile, date, minute), so the upcoming-
+appointment query reads only the rows it returns. The queries are fixed
+strings, and the sqlite3 module keeps them compiled in its statement
+cache.
+
+ScreenUI still works from a plain list of appointment dicts. A profile
+whose "appointments" entry in config.json names a .db file reads its
+list from here through load_appointments(), on a read-only connection.
+"""
+import json
+import os
+import sqlite3
+from datetime import date, datetime
+from functools import lru_cache
+from pathlib import Path
+
+STORE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS appointments (
+    profile TEXT NOT NULL,
+    date TEXT NOT NULL,      -- YYYY-MM-DD
+    time TEXT NOT NULL,      -- as written, e.g. "2:30 PM"
+    minute INTEGER NOT NULL, -- minutes after midnight, for ordering
+    type TEXT NOT NULL,
+    UNIQUE (profile, date, time)
+);
+CREATE INDEX IF NOT EXISTS appointments_by_profile_date
+    ON appointments (profile, date, minute);
+"""
+
+_UPSERT = """
+INSERT INTO appointments (profile, date, time, minute, type) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (profile, date, time) DO UPDATE SET type = excluded.type, minute = excluded.minute
+"""
+_UPCOMING = """
+SELECT date, time, type FROM appointments
+WHERE profile = ? AND date >= ? ORDER BY date, minute, rowid LIMIT ?
+"""
+_ALL = "SELECT date, time, type FROM appointments WHERE profile = ? ORDER BY date, minute, rowid"
+
+# Appointments without a readable time sort last on their day
+_UNKNOWN_MINUTE = 24 * 60
+
+
+@lru_cache(maxsize=1024)  # a schedule repeats the same few slots
+def _minute(time_str):
+    for fmt in ('%I:%M %p', '%I %p', '%H:%M'):
+        try:
+            parsed = datetime.strptime(time_str.strip().upper(), fmt)
+        except ValueError:
+            continue
+        return parsed.hour * 60 + parsed.minute
+    return _UNKNOWN_MINUTE
+
+
+def is_store_path(path):
+    return os.path.splitext(path)[1].lower() in STORE_EXTENSIONS
+
+
+def store_source(path, profile):
+    """The appointments_path a profile uses to read from the store at path"""
+    return (path, profile)
+
+
+def load_appointments(source):
+    """Appointment dicts from a JSON file or a store_source(); raises on errors"""
+    if isinstance(source, tuple):
+        path, profile = source
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        with AppointmentStore(path, readonly=True) as store:
+            return store.appointments(profile)
+    with open(source, 'r') as f:
+        return json.load(f).get('appointments', [])
+
+
+class AppointmentStore:
+    """A store file; readonly opens an existing one without touching its schema"""
+
+    def __init__(self, path, readonly=False):
+        self.path = path
+        if readonly:
+            self.conn = sqlite3.connect(Path(path).absolute().as_uri() + '?mode=ro', uri=True)
+            return
+        self.conn = sqlite3.connect(path)
+        # WAL is kept in the file, so readers (the tracker) aren't blocked while an import writes
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def upsert(self, rows, profile=None, replace=False):
+        """Insert or update appointment dicts in one transaction.
+
+        Rows carry their own "profile"; profile fills it in for rows
+        without one. With replace, the existing appointments of every
+        imported profile are dropped first, so the store mirrors the import. Returns (stored, skipped) where
+        skipped lists the rows that lack a valid date, time or type.
+        """
+        values = []
+        skipped = []
+        for row in rows:
+            try:
+                row_profile = row.get('profile') or profile
+                if len(row['date']) != 10:
+                    raise ValueError(row['date'])
+                date.fromisoformat(row['date'])
+                value = (row_profile, row['date'], row['time'], _minute(row['time']), row['type'])
+            except (KeyError, TypeError, ValueError, AttributeError):
+                value = None
+            if value is None or not row_profile or not isinstance(value[4], str):
+                skipped.append(row)
+            else:
+                values.append(value)
+        with self.conn:
+            if replace:
+                self.conn.executemany('DELETE FROM appointments WHERE profile = ?',
+                                      [(name,) for name in {v[0] for v in values}])
+            self.conn.executemany(_UPSERT, values)
+        return len(values), skipped
+
+    def next_appointments(self, profile, today, limit=1):
+        """The first limit appointments on or after today, soonest first"""
+        rows = self.conn.execute(_UPCOMING, (profile, today.isoformat(), limit))
+        return [{'date': d, 'time': t, 'type': kind} for d, t, kind in rows]
+
+    def appointments(self, profile):
+        """Every appointment of a profile, in date and time order"""
+        return [{'date': d, 'time': t, 'type': kind} for d, t, kind in self.conn.execute(_ALL, (profile,))]
+
+    def profiles(self):
+        return [name for (name,) in self.conn.execute('SELECT DISTINCT profile FROM appointments ORDER BY profile')]
+
+    def export_json(self, profile, path):
+        """Write a profile's appointments in the appointments.json format"""
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'appointments': self.appointments(profile)}, f, indent=4)
+            f.write('\n')
+        os.replace(tmp_path, path)
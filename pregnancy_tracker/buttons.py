@@ -0,0 +1,72 @@
+"""Button input for the four keys on the Waveshare HAT.
+
+Presses arrive through GPIO edge interrupts instead of polling, so the
+process can block until a key is pressed or the next scheduled refresh.
+"""
+import logging
+import queue
+import time
+
+from .logs import event
+
+# Button number -> BCM pin on the 2.7" HAT
+DEFAULT_PINS = {1: 5, 2: 6, 3: 13, 4: 19}
+
+
+class ButtonInput:
+    """Queues page requests from button presses"""
+
+    def __init__(self, gpio, pins=None, debounce=1.0, max_pending=16, clock=time.monotonic):
+        self.gpio = gpio
+        self.pins = dict(pins or DEFAULT_PINS)
+        self.debounce = debounce
+        self.clock = clock
+        self.events = queue.Queue(maxsize=max_pending)
+        self.dropped = 0
+        self.debounced = 0
+        self._last_press_time = None
+        self._pin_to_button = {pin: btn for btn, pin in self.pins.items()}
+
+        gpio.setmode(gpio.BCM)
+        gpio.setwarnings(False)
+        for pin in self.pins.values():
+            gpio.setup(pin, gpio.IN, pull_up_down=gpio.PUD_UP)
+            # Falling edge: button pulls the pin LOW
+            gpio.add_event_detect(pin, gpio.FALLING, callback=self._on_edge, bouncetime=50)
+
+    def _on_edge(self, pin):
+        now = self.clock()
+        if self._last_press_time is not None and now - self._last_press_time <= self.debounce:
+            self.debounced += 1
+            return
+        self._last_press_time = now
+        try:
+            self.events.put_nowait(self._pin_to_button[pin] - 1)
+        except queue.Full:
+            self.dropped += 1
+
+    def get(self, timeout=None):
+        """Next requested page, or None if timeout passes first"""
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def drain(self):
+        """All pages requested since the last call, oldest first"""
+        pages = []
+        while True:
+            try:
+                pages.append(self.events.get_nowait())
+            except queue.Empty:
+                return pages
+
+    def cleanup(self):
+        """Release the button pins only; the e-paper driver owns the others"""
+        pins = list(self.pins.values())
+        for pin in pins:
+            try:
+                self.gpio.remove_event_detect(pin)
+            except Exception:
+                event('button_cleanup_failed', level=logging.WARNING, pin=pin, exc_info=True)
+        self.gpio.cleanup(pins)
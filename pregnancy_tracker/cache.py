@@ -0,0 +1,168 @@
+"""Bounded LRU caches shared by the renderer.
+
+Every cache has an entry limit and a byte budget. Budgets are estimates,
+but they keep the resident size predictable on small boards like the
+Pi Zero. Call configure_caches() once at startup to apply the budgets
+from config.json.
+"""
+import threading
+from collections import OrderedDict
+
+# Default budgets in bytes
+DEFAULT_BUDGETS = {
+    'fonts': 4 * 1024 * 1024,
+    'icons': 256 * 1024,
+    'pages': 512 * 1024,
+    'layouts': 64 * 1024,
+}
+
+# Budgets used when low_memory is enabled
+LOW_MEMORY_BUDGETS = {
+    'fonts': 1024 * 1024,
+    'icons': 64 * 1024,
+    'pages': 0,
+    'layouts': 16 * 1024,
+}
+
+
+def image_size(img):
+    """Approximate bytes held by a PIL image"""
+    return img.width * img.height * len(img.getbands())
+
+
+class LRUCache:
+    """Least recently used cache capped by entry count and total bytes.
+
+    The byte budget never evicts below min_entries entries, for caches
+    whose working set must stay resident however small the budget is.
+    """
+
+    __slots__ = ('name', 'max_entries', 'min_entries', 'max_bytes', 'sizeof',
+                 '_data', '_bytes', '_lock', 'hits', 'misses')
+
+    def __init__(self, name, max_bytes, max_entries=256, sizeof=None, min_entries=0):
+        self.name = name
+        self.max_entries = max_entries
+        self.min_entries = min_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (lambda value: 1)
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                size, value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._data:
+                self._bytes -= self._data.pop(key)[0]
+            # Values larger than the whole budget are never stored, unless kept by min_entries
+            if (size > self.max_bytes and not self.min_entries) or self.max_entries <= 0:
+                return value
+            self._data[key] = (size, value)
+            self._bytes += size
+            self._evict()
+        return value
+
+    def get_or_create(self, key, factory):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = self.put(key, factory())
+        return value
+
+    def resize(self, max_bytes=None, max_entries=None, min_entries=None):
+        with self._lock:
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if min_entries is not None:
+                self.min_entries = min_entries
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self):
+        return {
+            'entries': len(self._data),
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+    def _evict(self):
+        while len(self._data) > self.max_entries or (
+                self._bytes > self.max_bytes and len(self._data) > self.min_entries):
+            _, (size, _) = self._data.popitem(last=False)
+            self._bytes -= size
+
+
+_MISSING = object()
+
+_caches = {}
+
+
+def get_cache(name, sizeof=None, max_entries=None, min_entries=None):
+    """Return the shared cache called name, creating it on first use"""
+    cache = _caches.get(name)
+    if cache is None:
+        cache = _caches.setdefault(name, LRUCache(name, DEFAULT_BUDGETS.get(name, 256 * 1024)))
+    if sizeof is not None:
+        cache.sizeof = sizeof
+    if max_entries is not None or min_entries is not None:
+        cache.resize(max_entries=max_entries, min_entries=min_entries)
+    return cache
+
+
+def resolve_budgets(low_memory=False, budgets=None):
+    """Byte budget per cache: the mode's defaults overridden by budgets"""
+    selected = dict(LOW_MEMORY_BUDGETS if low_memory else DEFAULT_BUDGETS)
+    selected.update(budgets or {})
+    return selected
+
+
+def configure_caches(low_memory=False, budgets=None):
+    """Apply byte budgets to every shared cache.
+
+    budgets maps cache name to a byte budget and overrides the defaults
+    for the selected mode.
+    """
+    selected = resolve_budgets(low_memory, budgets)
+    for name, max_bytes in selected.items():
+        get_cache(name).resize(max_bytes=int(max_bytes))
+    return selected
+
+
+def cache_stats():
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+
+def clear_caches():
+    for cache in _caches.values():
+        cache.clear()
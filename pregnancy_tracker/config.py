@@ -0,0 +1,365 @@
+"""config.json: validation, a frozen Config, and live reload.
+
+load_config() checks the whole file against SCHEMA and reports every
+problem at once. Unknown keys only give a warning. The returned Config
+is read-only and carries the derived state (profiles, displays, resolved
+cache budgets, refresh policy, button pins), so callers don't need to
+re-parse anything.
+
+ConfigWatcher polls the file's mtime. When it changes, the watcher
+reloads it and hands the old and new Config to a callback, and
+Config.changes() says which top-level keys differ. A file that fails to
+parse or validate is logged and ignored. Every good config is copied to
+a last-good file, and boot falls back to that copy if config.json is
+broken.
+"""
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from types import MappingProxyType
+
+from .buttons import DEFAULT_PINS
+from .cache import resolve_budgets
+from .display import REFRESH_MODES
+from .fonts import TEXT_RENDERERS
+from .logs import event
+from .panel import PANEL_SIZES
+from .power import DEFAULT_SETTINGS as DEFAULT_POWER_SETTINGS
+from .profiles import load_displays, load_profiles
+from .profiling import DEFAULT_SETTINGS as DEFAULT_PROFILING_SETTINGS, PROFILE_MODES
+
+# Each check wakes the Pi from its idle wait, so keep them rare
+DEFAULT_POLL_SECONDS = 300
+LOG_LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+
+
+class ConfigError(ValueError):
+    """config.json is unreadable or doesn't match the schema"""
+
+    def __init__(self, path, problems):
+        self.path = path
+        self.problems = problems
+        super().__init__(f"{path}: " + "; ".join(problems))
+
+
+# Validators append a message to problems and return nothing
+
+def _date(value, where, problems):
+    try:
+        datetime.strptime(value, '%Y-%m-%d')
+    except (TypeError, ValueError):
+        problems.append(f"{where} must be a date like 2025-05-15, got {value!r}")
+
+
+def _type(*types, name):
+    def check(value, where, problems):
+        # bool is an int subclass, but true is never a valid number here
+        if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+            problems.append(f"{where} must be {name}, got {value!r}")
+    return check
+
+
+_bool = _type(bool, name='true or false')
+_string = _type(str, name='a string')
+_number = _type(int, float, name='a number')
+
+
+def _non_negative(check):
+    def non_negative(value, where, problems):
+        before = len(problems)
+        check(value, where, problems)
+        if len(problems) == before and value < 0:
+            problems.append(f"{where} must not be negative, got {value!r}")
+    return non_negative
+
+
+def _positive(value, where, problems):
+    before = len(problems)
+    _number(value, where, problems)
+    if len(problems) == before and value <= 0:
+        problems.append(f"{where} must be greater than 0, got {value!r}")
+
+
+def _choice(*choices):
+    def check(value, where, problems):
+        if value not in choices:
+            problems.append(f"{where} must be one of {', '.join(choices)}, got {value!r}")
+    return check
+
+
+def _object(fields, required=()):
+    def check(value, where, problems):
+        if not isinstance(value, dict):
+            problems.append(f"{where} must be an object, got {value!r}")
+            return
+        for key in required:
+            if key not in value:
+                problems.append(f"{where}.{key} is required")
+        for key, item in value.items():
+            if key in fields:
+                fields[key](item, f"{where}.{key}", problems)
+            else:
+                event('config_unknown_key', level=logging.WARNING, key=f"{where}.{key}")
+    return check
+
+
+def _map_of(check_value):
+    def check(value, where, problems):
+        if not isinstance(value, dict):
+            problems.append(f"{where} must be an object, got {value!r}")
+            return
+        for key, item in value.items():
+            check_value(item, f"{where}.{key}", problems)
+    return check
+
+
+def _list_of(check_item):
+    def check(value, where, problems):
+        if not isinstance(value, list) or not value:
+            problems.append(f"{where} must be a non-empty list")
+            return
+        for i, item in enumerate(value):
+            check_item(item, f"{where}[{i}]", problems)
+    return check
+
+
+def _pin_map(value, where, problems):
+    _map_of(_non_negative(_type(int, name='a BCM pin number')))(value, where, problems)
+    if isinstance(value, dict):
+        for key in value:
+            if key not in ('1', '2', '3', '4'):
+                problems.append(f"{where} keys must be button numbers 1-4, got {key!r}")
+
+
+_profile = _object({
+    'name': _string,
+    'expected_birth_date': _date,
+    'appointments': _string,
+    'display': _string,
+}, required=('expected_birth_date',))
+
+_display = _object({
+    'model': _choice(*PANEL_SIZES, 'simulated'),
+    'rotate_seconds': _non_negative(_number),
+})
+
+# Refresh policy and the power figures used for the energy estimate
+_power = _object({
+    'refresh_mode': _choice(*REFRESH_MODES),
+    'min_idle_seconds': _non_negative(_number),
+    'refresh_watts': _non_negative(_number),
+    'active_watts': _non_negative(_number),
+})
+
+_buttons = _object({
+    'pins': _pin_map,
+    'debounce': _non_negative(_number),
+})
+
+# What SIGUSR1 or the profile flag file captures
+_profiling = _object({
+    'mode': _choice(*PROFILE_MODES),
+    'renders': _positive,
+    'seconds': _positive,
+    'interval': _positive,
+    'dir': _string,
+})
+
+SCHEMA = _object({
+    'expected_birth_date': _date,
+    'profiles': _list_of(_profile),
+    'displays': _map_of(_display),
+    'low_memory': _bool,
+    'cache_budgets': _map_of(_non_negative(_type(int, name='a byte count'))),
+    'power': _power,
+    'buttons': _buttons,
+    'log_level': _choice(*LOG_LEVELS),
+    'log_dump_path': _string,
+    'config_poll_seconds': _positive,
+    'text_renderer': _choice(*TEXT_RENDERERS),
+    'glyph_atlas': _string,
+    'profiling': _profiling,
+})
+
+
+def profiling_problems(data, where):
+    """Problems with a "profiling" object, e.g. the overrides in a profile flag file"""
+    problems = []
+    _profiling(data, where, problems)
+    return problems
+
+
+def validate(data, path='config.json'):
+    """Raise ConfigError listing everything wrong with data"""
+    problems = []
+    SCHEMA(data, 'config', problems)
+    if isinstance(data, dict) and 'expected_birth_date' not in data and 'profiles' not in data:
+        problems.append("config needs expected_birth_date or profiles")
+    if problems:
+        raise ConfigError(path, problems)
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class Config:
+    """Validated, read-only config with everything derived from it"""
+
+    __slots__ = ('path', 'raw', 'profiles', 'displays', 'low_memory', 'cache_budgets',
+                 'power', 'button_pins', 'button_debounce', 'log_level', 'log_dump_path',
+                 'poll_seconds', 'text_renderer', 'glyph_atlas', 'profiling', 'profile_dir')
+
+    def __init__(self, data, path):
+        validate(data, path)
+        base_dir = os.path.dirname(os.path.abspath(path))
+        set_field = object.__setattr__
+        set_field(self, 'path', path)
+        set_field(self, 'raw', _freeze(data))
+        profiles = load_profiles(data, base_dir)
+        set_field(self, 'profiles', tuple(profiles))
+        set_field(self, 'displays', _freeze(load_displays(data, profiles)))
+        set_field(self, 'low_memory', data.get('low_memory', False))
+        set_field(self, 'cache_budgets', _freeze(resolve_budgets(self.low_memory, data.get('cache_budgets'))))
+        set_field(self, 'power', _freeze(dict(DEFAULT_POWER_SETTINGS, **data.get('power', {}))))
+        buttons = data.get('buttons', {})
+        pins = {int(button): pin for button, pin in buttons.get('pins', {}).items()}
+        set_field(self, 'button_pins', _freeze({**DEFAULT_PINS, **pins}))
+        set_field(self, 'button_debounce', buttons.get('debounce', 1.0))
+        set_field(self, 'log_level', data.get('log_level'))
+        set_field(self, 'log_dump_path', data.get('log_dump_path'))
+        set_field(self, 'poll_seconds', data.get('config_poll_seconds', DEFAULT_POLL_SECONDS))
+        set_field(self, 'text_renderer', data.get('text_renderer', 'freetype'))
+        atlas = data.get('glyph_atlas')
+        set_field(self, 'glyph_atlas', os.path.join(base_dir, atlas) if atlas else None)
+        profiling = dict(data.get('profiling', {}))
+        profile_dir = profiling.pop('dir', os.path.join('cache', 'profiles'))
+        set_field(self, 'profiling', _freeze(dict(DEFAULT_PROFILING_SETTINGS, **profiling)))
+        set_field(self, 'profile_dir', os.path.join(base_dir, profile_dir))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Config is read-only; edit config.json instead")
+
+    def changes(self, other):
+        """Top-level keys whose values differ between two configs"""
+        keys = set(self.raw) | set(other.raw)
+        return {key for key in keys if self.raw.get(key) != other.raw.get(key)}
+
+    def raw_dict(self):
+        """Plain, mutable copy of the config data"""
+        return _thaw(self.raw)
+
+    def __repr__(self):
+        return f"Config({self.path!r}, profiles={list(self.profiles)!r})"
+
+
+def _thaw(value):
+    if isinstance(value, MappingProxyType):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+def _read(path, data_path=None):
+    """Config for path, optionally with the data read from data_path"""
+    data_path = data_path or path
+    try:
+        with open(data_path) as f:
+            data = json.load(f)
+    except OSError as e:
+        raise ConfigError(data_path, [f"cannot read: {e.strerror}"])
+    except ValueError as e:
+        raise ConfigError(data_path, [f"not valid JSON: {e}"])
+    return Config(data, path)
+
+
+def last_good_path(path):
+    return os.path.join(os.path.dirname(os.path.abspath(path)), 'cache', 'config.last-good.json')
+
+
+def _save_last_good(path):
+    target = last_good_path(path)
+    try:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(path, 'rb') as src, open(target + '.tmp', 'wb') as dst:
+            dst.write(src.read())
+        os.replace(target + '.tmp', target)
+    except OSError as e:
+        event('config_last_good_failed', level=logging.WARNING, error=str(e))
+
+
+def load_config(path, fallback=True):
+    """Load and validate path.
+
+    With fallback, a broken file is logged and the last good copy is
+    used instead. ConfigError is raised only if neither can be loaded.
+    """
+    try:
+        config = _read(path)
+    except ConfigError as e:
+        if not fallback or not os.path.exists(last_good_path(path)):
+            raise
+        event('config_invalid', level=logging.ERROR, path=path, problems=e.problems,
+              using=last_good_path(path))
+        # Relative appointment paths still resolve next to config.json
+        return _read(path, last_good_path(path))
+    if fallback:
+        _save_last_good(path)
+    return config
+
+
+class ConfigWatcher:
+    """Polls config.json and reports validated changes.
+
+    Call poll() from the main loop (at most every poll_seconds, see
+    next_poll_in()). on_change(old, new, changed_keys) runs in the
+    caller's thread, so it can touch the UI without locking.
+    """
+
+    def __init__(self, config, on_change, clock=time.monotonic):
+        self.config = config
+        self.on_change = on_change
+        self.clock = clock
+        self._stamp = self._stat()
+        self._next_poll = self.clock() + config.poll_seconds
+
+    def _stat(self):
+        try:
+            st = os.stat(self.config.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def next_poll_in(self):
+        return max(0.0, self._next_poll - self.clock())
+
+    def poll(self, force=False):
+        """Reload if the file changed; returns the set of changed keys"""
+        if not force and self.clock() < self._next_poll:
+            return set()
+        self._next_poll = self.clock() + self.config.poll_seconds
+        stamp = self._stat()
+        if stamp == self._stamp and not force:
+            return set()
+        self._stamp = stamp
+        try:
+            new = _read(self.config.path)
+        except ConfigError as e:
+            # Keep running on the last good config until the file is fixed
+            event('config_invalid', level=logging.ERROR, path=self.config.path, problems=e.problems)
+            return set()
+        changed = self.config.changes(new)
+        if not changed:
+            return set()
+        _save_last_good(self.config.path)
+        old, self.config = self.config, new
+        event('config_reloaded', changed=sorted(changed))
+        self.on_change(old, new, changed)
+        return changed
@@ -0,0 +1,263 @@
+"""Everything the pages show for each day of the pregnancy, built once.
+
+Week, size, milestone and next-appointment text only change at
+midnight, so they are worked out for every day from conception to six
+weeks past the due date when the due date or appointments change. A
+render then looks its day up by index instead of parsing appointment
+dates and scanning the size and milestone tables.
+
+The table is array-backed: every distinct string is stored once in a
+UTF-8 blob, and each day is a row of string ids. It can be written to a
+cache file and memory-mapped back without parsing. The progress
+percentage still comes from the clock, since it moves during the day.
+"""
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+from array import array
+from datetime import datetime, timedelta
+
+from .developmental_milestones import get_milestone_for_week
+from .logs import event
+from .size_data import get_size_for_week
+
+INDEX_VERSION = 1
+INDEX_DAYS = 322  # 46 weeks: term plus six weeks post-term
+MAGIC = b'PTIDX\0'
+HEADER = struct.Struct('<6sH16sIII')  # magic, version, key, days, strings, blob bytes
+
+# String fields stored for every day
+FIELDS = (
+    'weekday_str',       # "12w 3d"
+    'size_comparison',
+    'size_length',
+    'milestone_title',   # "Week 12 Milestones"
+    'weight',
+    'development',
+    'appt_date',         # raw next-appointment fields, "" when there is none
+    'appt_time',
+    'appt_type',
+    'appt_datetime',     # "AUG 15 • 2:30 PM"
+)
+
+
+def next_appointment(appointments, today):
+    """The first appointment on or after today, or None"""
+    future_appointments = []
+    for appt in appointments:
+        try:
+            appt_date = datetime.strptime(appt['date'], '%Y-%m-%d').date()
+            if appt_date >= today:
+                future_appointments.append((appt_date, appt))
+        except Exception:
+            continue
+
+    # Sort by date and return the first one
+    if future_appointments:
+        future_appointments.sort(key=lambda x: x[0])
+        return future_appointments[0][1]
+    return None
+
+
+def format_appointment_datetime(appt):
+    appt_date = datetime.strptime(appt['date'], '%Y-%m-%d')
+    date_str = appt_date.strftime('%b %d').upper()  # Shortened format like "AUG 15"
+    return f"{date_str} • {appt['time']}"
+
+
+class DayEntry:
+    """Page content for one pregnancy day"""
+
+    __slots__ = ('day', 'week') + FIELDS
+
+    @property
+    def appointment(self):
+        """Next appointment as a dict, like appointments.json, or None"""
+        if not self.appt_date:
+            return None
+        return {'date': self.appt_date, 'time': self.appt_time, 'type': self.appt_type}
+
+
+def compute_day(day, appointment):
+    """DayEntry for a pregnancy day, given that day's next appointment"""
+    entry = DayEntry()
+    week = day // 7
+    entry.day = day
+    entry.week = week
+    entry.weekday_str = f'{week}w {day % 7}d'
+    entry.size_comparison, entry.size_length = get_size_for_week(week)
+    milestone = get_milestone_for_week(week)
+    entry.milestone_title = f"Week {week} Milestones"
+    entry.weight = milestone['weight']
+    entry.development = milestone['development']
+    if appointment:
+        entry.appt_date = appointment['date']
+        entry.appt_time = appointment['time']
+        entry.appt_type = appointment['type']
+        entry.appt_datetime = format_appointment_datetime(appointment)
+    else:
+        entry.appt_date = entry.appt_time = entry.appt_type = entry.appt_datetime = ''
+    return entry
+
+
+def index_key(pregnancy, appointments):
+    """Digest of everything the table is built from"""
+    source = json.dumps([INDEX_VERSION, INDEX_DAYS, pregnancy.birth_date.isoformat(), appointments],
+                        sort_keys=True)
+    return hashlib.blake2b(source.encode('utf-8'), digest_size=16).digest()
+
+
+class DayIndex:
+    """Day-indexed content table; see the module docstring"""
+
+    def __init__(self, key, days, offsets, ids, weeks, blob, mapped=None):
+        self.key = key
+        self.days = days
+        self._offsets = offsets
+        self._ids = ids
+        self._weeks = weeks
+        self._blob = blob
+        self._mapped = mapped
+        self._strings = {}
+
+    def __len__(self):
+        return self.days
+
+    @classmethod
+    def build(cls, pregnancy, appointments, days=INDEX_DAYS):
+        start = pregnancy.pregnancy_start_date.date()
+        strings = {}
+        blob = bytearray()
+        offsets = array('I', [0])
+        ids = array('I')
+        weeks = array('i')
+
+        def intern(value):
+            string_id = strings.get(value)
+            if string_id is None:
+                string_id = strings[value] = len(offsets) - 1
+                blob.extend(value.encode('utf-8'))
+                offsets.append(len(blob))
+            return string_id
+
+        # Same ordering as next_appointment(): by date, file order for ties
+        upcoming = []
+        for appt in appointments:
+            try:
+                upcoming.append((datetime.strptime(appt['date'], '%Y-%m-%d').date(), appt))
+            except Exception:
+                continue
+        upcoming.sort(key=lambda x: x[0])
+
+        position = 0
+        for day in range(days):
+            date = start + timedelta(days=day)
+            while position < len(upcoming) and upcoming[position][0] < date:
+                position += 1
+            appointment = upcoming[position][1] if position < len(upcoming) else None
+            entry = compute_day(day, appointment)
+            weeks.append(entry.week)
+            ids.extend(intern(getattr(entry, field)) for field in FIELDS)
+
+        return cls(index_key(pregnancy, appointments), days, offsets, ids, weeks, bytes(blob))
+
+    @classmethod
+    def load_or_build(cls, pregnancy, appointments, path):
+        """Map the cache file if it matches, otherwise rebuild and rewrite it"""
+        key = index_key(pregnancy, appointments)
+        try:
+            index = cls.load(path)
+            if index.key == key:
+                return index
+            index.close()
+        except FileNotFoundError:
+            event('day_index_missing', level=logging.DEBUG, path=path)
+        except (OSError, ValueError):
+            event('day_index_unreadable', level=logging.WARNING, path=path, exc_info=True)
+        index = cls.build(pregnancy, appointments)
+        try:
+            index.save(path)
+        except OSError:
+            # A read-only card still gets the in-memory table
+            event('day_index_save_failed', level=logging.WARNING, path=path, exc_info=True)
+        return index
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, INDEX_VERSION, self.key, self.days,
+                                len(self._offsets) - 1, len(self._blob)))
+            self._offsets.tofile(f)
+            self._ids.tofile(f)
+            self._weeks.tofile(f)
+            f.write(self._blob)
+            f.flush()
+            # On disk before the rename, so a power cut can't leave a partial file in place
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Map a saved index; ValueError if the file is malformed or from another version"""
+        with open(path, 'rb') as f:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(f"{path} is empty")
+        view = memoryview(mapped)
+        sections = []
+        try:
+            if len(view) < HEADER.size:
+                raise ValueError(f"{path} is truncated")
+            magic, version, key, days, nstrings, blob_len = HEADER.unpack_from(view)
+            if magic != MAGIC or version != INDEX_VERSION:
+                raise ValueError(f"{path} is not a day index")
+            counts = (nstrings + 1, days * len(FIELDS), days)
+            if len(view) != HEADER.size + 4 * sum(counts) + blob_len:
+                raise ValueError(f"{path} is truncated or has trailing data")
+            pos = HEADER.size
+            for count, fmt in zip(counts, ('I', 'I', 'i')):
+                sections.append(view[pos:pos + count * 4].cast(fmt))
+                pos += count * 4
+            sections.append(view[pos:pos + blob_len])
+            if sections[0][-1] != blob_len:
+                raise ValueError(f"{path} has a corrupt string table")
+        except Exception as e:
+            # Every view must be released before the map can be closed
+            for section in sections:
+                section.release()
+            view.release()
+            mapped.close()
+            if isinstance(e, ValueError):
+                raise
+            raise ValueError(f"{path} is not a valid day index: {e}") from e
+        offsets, ids, weeks, blob = sections
+        return cls(key, days, offsets, ids, weeks, blob, mapped)
+
+    def close(self):
+        if self._mapped is not None:
+            self._offsets = self._ids = self._weeks = self._blob = None
+            self._mapped = None
+
+    def _string(self, string_id):
+        value = self._strings.get(string_id)
+        if value is None:
+            start, end = self._offsets[string_id], self._offsets[string_id + 1]
+            value = self._strings[string_id] = bytes(self._blob[start:end]).decode('utf-8')
+        return value
+
+    def entry(self, day):
+        """DayEntry for a pregnancy day, or None outside the table"""
+        if not 0 <= day < self.days:
+            return None
+        entry = DayEntry()
+        entry.day = day
+        entry.week = self._weeks[day]
+        row = day * len(FIELDS)
+        for i, field in enumerate(FIELDS):
+            setattr(entry, field, self._string(self._ids[row + i]))
+        return entry
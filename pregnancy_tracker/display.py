@@ -0,0 +1,216 @@
+"""Display backends: the real Waveshare panel or a simulated one.
+
+Both expose the same small interface (width, height, init, clear,
+getbuffer, display, sleep), so main.py and the fan-out code never import
+the Waveshare driver directly. The simulator models what the panel
+costs -- SPI transfer, refresh waveforms, busy-pin polling and ghosting
+from repeated partial refreshes -- and records every frame it receives,
+so render and refresh policies can be measured on any Linux box.
+"""
+import importlib
+import math
+import time
+from collections import deque
+
+from .panel import pack_frame, panel_size
+
+REFRESH_MODES = ('full', 'fast', 'partial')
+
+
+class DisplayBackend:
+    """Interface shared by every display backend"""
+
+    width = 0
+    height = 0
+
+    def init(self, mode='full'):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def getbuffer(self, image):
+        return pack_frame(image, self.width, self.height)
+
+    def display(self, buffer, mode='full'):
+        raise NotImplementedError
+
+    def sleep(self):
+        raise NotImplementedError
+
+
+class WaveshareBackend(DisplayBackend):
+    """A physical panel driven through the waveshare_epd library"""
+
+    def __init__(self, model):
+        self.model = model
+        self.epd = importlib.import_module(f'waveshare_epd.{model}').EPD()
+        self.width = self.epd.width
+        self.height = self.epd.height
+        self._mode = None
+
+    def init(self, mode='full'):
+        if mode == 'fast' and hasattr(self.epd, 'init_Fast'):
+            self.epd.init_Fast()
+            self._mode = 'fast'
+        else:
+            self.epd.init()
+            self._mode = 'full'
+
+    def clear(self):
+        self.epd.Clear()
+
+    def getbuffer(self, image):
+        return self.epd.getbuffer(image)
+
+    def display(self, buffer, mode='full'):
+        # Re-initialise only when the panel was set up for the other LUT
+        if mode == 'fast' and hasattr(self.epd, 'display_Fast'):
+            if self._mode != 'fast':
+                self.init('fast')
+            self.epd.display_Fast(buffer)
+        elif mode == 'partial' and hasattr(self.epd, 'display_Partial'):
+            self.epd.display_Partial(buffer, 0, 0, self.width, self.height)
+        else:
+            if self._mode == 'fast':
+                self.init('full')
+            self.epd.display(buffer)
+
+    def sleep(self):
+        self.epd.sleep()
+        self._mode = None
+
+
+class SimClock:
+    """Virtual clock; sleep() advances time instantly"""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class RealClock:
+    """Wall clock; sleep() really blocks, like the hardware"""
+
+    def time(self):
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class FrameRecord:
+    __slots__ = ('time', 'mode', 'buffer', 'duration', 'ghosting')
+
+    def __init__(self, time, mode, buffer, duration, ghosting):
+        self.time = time
+        self.mode = mode
+        self.buffer = buffer
+        self.duration = duration
+        self.ghosting = ghosting
+
+
+class SimulatedEPD(DisplayBackend):
+    """Stand-in panel with a timing model of the 2.7" V2.
+
+    Durations are in seconds. The refresh times follow the Waveshare
+    2.7" V2 datasheet; the reset and sleep delays, the 4 MHz SPI clock
+    and the 20 ms busy polling follow its Python driver. Override any of
+    them through the constructor.
+    """
+
+    TIMINGS = {
+        'reset': 0.402,       # reset pin high 200 ms, low 2 ms, high 200 ms before every init
+        'swreset': 0.01,      # controller busy after the software reset command
+        'full': 6.0,
+        'fast': 1.5,
+        'partial': 0.3,
+        'sleep': 2.0,         # the driver waits 2 s after the deep sleep command
+    }
+
+    def __init__(self, model='epd2in7_V2', clock=None, spi_hz=4_000_000, busy_poll=0.02,
+                 max_frames=64, timings=None):
+        self.model = model
+        self.width, self.height = panel_size(model)
+        self.clock = clock or SimClock()
+        self.spi_hz = spi_hz
+        self.busy_poll = busy_poll
+        self.timings = dict(self.TIMINGS, **(timings or {}))
+        self.frames = deque(maxlen=max_frames)  # max_frames=None keeps every frame
+        self.awake = False
+        self.ghosting = 0
+        self.busy_time = 0.0
+        self.counts = {'init': 0, 'sleep': 0, 'clear': 0, 'full': 0, 'fast': 0, 'partial': 0}
+        self.last_buffer = None
+
+    def _transfer(self, nbytes):
+        self._wait(nbytes * 8 / self.spi_hz)
+
+    def _busy(self, seconds):
+        # The driver polls the busy pin, so waits round up to the poll interval
+        self._wait(math.ceil(seconds / self.busy_poll) * self.busy_poll)
+
+    def _wait(self, seconds):
+        self.clock.sleep(seconds)
+        self.busy_time += seconds
+
+    def _require_awake(self):
+        if not self.awake:
+            raise RuntimeError("display used while asleep; call init() first")
+
+    def init(self, mode='full'):
+        self._wait(self.timings['reset'])
+        self._busy(self.timings['swreset'])
+        self.awake = True
+        self.counts['init'] += 1
+
+    def clear(self):
+        self._require_awake()
+        self._transfer(self.width * self.height // 8)
+        self._busy(self.timings['full'])
+        self.ghosting = 0
+        self.counts['clear'] += 1
+
+    def display(self, buffer, mode='full'):
+        if mode not in REFRESH_MODES:
+            raise ValueError(f"Unknown refresh mode: {mode}")
+        self._require_awake()
+        expected = self.width * self.height // 8
+        if len(buffer) != expected:
+            raise ValueError(f"Buffer is {len(buffer)} bytes, panel needs {expected}")
+        start = self.clock.time()
+        self._transfer(len(buffer))
+        self._busy(self.timings[mode])
+        if mode == 'full':
+            self.ghosting = 0
+        elif mode == 'fast':
+            self.ghosting = self.ghosting // 2
+        else:
+            self.ghosting += 1
+        self.counts[mode] += 1
+        self.last_buffer = bytes(buffer)
+        self.frames.append(FrameRecord(start, mode, self.last_buffer,
+                                       self.clock.time() - start, self.ghosting))
+
+    def sleep(self):
+        if self.awake:
+            self._wait(self.timings['sleep'])
+        self.awake = False
+        self.counts['sleep'] += 1
+
+    def stats(self):
+        return dict(self.counts, busy_time=self.busy_time, ghosting=self.ghosting)
+
+
+def create_backend(model, **options):
+    """Backend for a display model name; "simulated" needs no hardware"""
+    if model == 'simulated':
+        # Used in place of a real panel, so refreshes take real time
+        options.setdefault('clock', RealClock())
+        return SimulatedEPD(**options)
+    return WaveshareBackend(model)
@@ -0,0 +1,242 @@
+"""Serve several profiles to one or more displays from a single process.
+
+Pages are rendered in a process pool so a busy render never holds up a
+panel refresh. Fonts, icons and milestone data are loaded once in the
+parent before the pool forks, so every worker shares them. Each display
+runs in its own thread with its own refresh schedule, so a slow panel
+only delays itself.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+from .display import create_backend
+from .fonts import get_font
+from .icons import carriage_icon_path, moon_icon_path, load_icon
+from .layout import get_layout
+from .logs import event, log_level, setup_worker_logging
+from .power import PowerManager
+from .pregnancy import Pregnancy
+from .screen_ui import ScreenUI
+
+# ScreenUI per (profile, size), one set per worker process
+_worker_uis = {}
+
+
+def layout_font_sizes(layout):
+    """Every font size ScreenUI draws with for a layout"""
+    sizes = {getattr(layout, name) for name in layout.__slots__ if name.endswith('_pt')}
+    return sorted(sizes | set(layout.size_pts))
+
+
+def warm_shared_caches(sizes):
+    """Load the fonts (or atlas glyph sizes) and icons for each (width, height) ScreenUI size"""
+    for width, height in sizes:
+        layout = get_layout(width, height)
+        for pt in layout_font_sizes(layout):
+            get_font(pt).text_size('0')
+        # Under the same (path, size) keys ScreenUI looks them up with
+        load_icon(carriage_icon_path, layout.carriage_icon_size)
+        load_icon(moon_icon_path, layout.moon_icon_size)
+
+
+def init_worker(sizes, level):
+    """Pool initializer: log to stderr, then load the shared caches"""
+    setup_worker_logging(level)
+    warm_shared_caches(sizes)
+
+
+def render_page(spec, page, width, height):
+    """Render one page in a worker process and return the raw frame"""
+    _, expected_birth_date, appointments_path = spec
+    key = (spec, width, height)
+    screen_ui = _worker_uis.get(key)
+    if screen_ui is None:
+        screen_ui = ScreenUI(width, height, Pregnancy(expected_birth_date),
+                             appointments_path=appointments_path)
+        _worker_uis[key] = screen_ui
+    screen_ui.set_page(page)
+    img = screen_ui.draw()
+    return img.mode, img.size, img.tobytes()
+
+
+class RenderPool:
+    """Process pool that turns (profile, page) requests into images"""
+
+    def __init__(self, sizes, max_workers=None):
+        warm_shared_caches(sizes)
+        max_workers = max_workers or os.cpu_count() or 1
+        # fork shares the warmed caches with every worker; spawn rebuilds them once per worker
+        method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else None
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context(method),
+            initializer=init_worker,
+            initargs=(sizes, log_level()),
+        )
+        # With fork every worker starts on the first submit. Do that now, before the
+        # display threads run, so no thread holds a lock (a cache's, say) while they fork.
+        self._executor.submit(os.getpid).result()
+
+    def render(self, profile, page, width, height):
+        """Render in the pool and block until the image is ready"""
+        future = self._executor.submit(render_page, profile.spec(), page, width, height)
+        mode, size, data = future.result()
+        return Image.frombytes(mode, size, data)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class PooledScreen:
+    """The part of ScreenUI that PowerManager uses, with drawing done in the pool"""
+
+    def __init__(self, profiles, pool, width, height):
+        self.profiles = profiles
+        self.pool = pool
+        self.width = width
+        self.height = height
+        self.pregnancies = [p.create_pregnancy() for p in profiles]
+        self.profile_index = 0
+        self.current_page = 0
+
+    @property
+    def profile(self):
+        return self.profiles[self.profile_index]
+
+    @property
+    def pregnancy(self):
+        return self.pregnancies[self.profile_index]
+
+    def set_page(self, page_num):
+        if 0 <= page_num <= 3:
+            self.current_page = page_num
+
+    def draw(self):
+        return self.pool.render(self.profile, self.current_page, self.width, self.height)
+
+
+class DisplayWorker(threading.Thread):
+    """Drives one panel: shows requested pages and rotates its profiles.
+
+    A PowerManager per panel decides when to draw, so every panel is
+    redrawn when its page can next change (midnight, or the next 0.1% on
+    the progress page) and sleeps between refreshes, as in single mode.
+    """
+
+    def __init__(self, name, epd, profiles, pool, rotate_seconds=60, power_settings=None,
+                 clock=time.monotonic):
+        super().__init__(name=f'display-{name}', daemon=True)
+        self.display_name = name
+        self.epd = epd
+        self.profiles = profiles
+        self.rotate_seconds = rotate_seconds
+        self.clock = clock
+        self.screen = PooledScreen(profiles, pool, epd.height, epd.width)
+        self.power = PowerManager(epd, self.screen, power_settings)
+        self.page = 0
+        self._pending = 0  # show the first frame straight away
+        self._next_rotate = None
+        self._stopped = False
+        self._cond = threading.Condition()
+
+    def show_page(self, page):
+        """Ask for page on the current profile; only the latest request is kept"""
+        with self._cond:
+            self.page = page
+            self._pending = page
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def _wait_for_work(self):
+        """Block until a page is requested, a profile is due to rotate or the screen can change"""
+        rotate = len(self.profiles) > 1 and self.rotate_seconds
+        with self._cond:
+            if self._pending is None and not self._stopped:
+                timeout = self.power.idle_window()
+                if rotate:
+                    timeout = min(timeout, max(0, self._next_rotate - self.clock()))
+                self._cond.wait(timeout)
+            if self._stopped:
+                return False
+            page, self._pending = self._pending, None
+        if page is not None:
+            self.power.request(page)
+        if rotate and self.clock() >= self._next_rotate:
+            self.screen.profile_index = (self.screen.profile_index + 1) % len(self.profiles)
+            self._next_rotate = self.clock() + self.rotate_seconds
+            self.power.request(self.screen.current_page)
+        return True
+
+    def run(self):
+        self._next_rotate = self.clock() + self.rotate_seconds
+        try:
+            self.power.clear()
+        except Exception as e:
+            event('display_error', level=logging.ERROR, display=self.display_name, error=str(e))
+        while self._wait_for_work():
+            try:
+                self.power.flush()
+            except Exception as e:
+                event('display_error', level=logging.ERROR, display=self.display_name,
+                      profile=self.screen.profile.name, error=str(e))
+
+
+class FanOut:
+    """All displays and the shared render pool for a multi-profile setup"""
+
+    def __init__(self, profiles, displays, power_settings=None, epd_factory=create_backend, max_workers=None):
+        epds = {name: epd_factory(settings['model']) for name, settings in displays.items()}
+        # ScreenUI is laid out in landscape, so (height, width) of the panel
+        sizes = sorted({(epd.height, epd.width) for epd in epds.values()})
+        self.pool = RenderPool(sizes, max_workers or min(len(profiles), os.cpu_count() or 1))
+        self.workers = []
+        for name, settings in displays.items():
+            shown = [p for p in profiles if p.display == name]
+            worker = DisplayWorker(name, epds[name], shown, self.pool,
+                                   settings.get('rotate_seconds', 60), power_settings)
+            self.workers.append(worker)
+
+    def start(self):
+        for worker in self.workers:
+            worker.start()
+
+    def show_page(self, page):
+        """Show page on the primary (first) display, the one the buttons are wired to.
+
+        The other displays keep their own page.
+        """
+        if self.workers:
+            self.workers[0].show_page(page)
+
+    @property
+    def current_page(self):
+        return self.workers[0].page if self.workers else 0
+
+    def stop(self, timeout=30):
+        """Stop the workers, wait for refreshes in progress, then put the panels to sleep"""
+        for worker in self.workers:
+            worker.stop()
+        for worker in self.workers:
+            if worker.is_alive():
+                worker.join(timeout)
+        for worker in self.workers:
+            if worker.is_alive():
+                # Still refreshing; sleeping the panel now would interrupt it
+                event('display_stop_timeout', level=logging.WARNING, display=worker.display_name)
+                continue
+            try:
+                worker.power.sleep()
+            except Exception:
+                event('display_sleep_failed', level=logging.WARNING, display=worker.display_name,
+                      exc_info=True)
+        self.pool.shutdown()
@@ -1,11 +1,71 @@
 import os
 from PIL import ImageFont
 
+from .cache import get_cache
+
 fonts_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'res/fonts')
 
 font_file_name = 'Merriweather-Black.ttf'
 font_file_path = os.path.join(fonts_dir, font_file_name)
+default_atlas_path = os.path.join(fonts_dir, 'Merriweather-Black.atlas')
+
+# Each FreeType face keeps its own copy of the font file in memory
+_font_bytes = os.path.getsize(font_file_path)
+# The most sizes one page draws with; fewer and every render reloads its own fonts
+FONTS_PER_PAGE = 6
+_font_cache = get_cache('fonts', sizeof=lambda font: _font_bytes, min_entries=FONTS_PER_PAGE)
+
+TEXT_RENDERERS = ('freetype', 'atlas')
+_atlas = None
 
 
 def create_font(pt):
-    return ImageFont.truetype(font_file_path, pt)
+    return _font_cache.get_or_create(pt, lambda: ImageFont.truetype(font_file_path, pt))
+
+
+class FreeTypeText:
+    """Text measurement and drawing with a FreeType face"""
+
+    __slots__ = ('pt',)
+
+    def __init__(self, pt):
+        self.pt = pt
+
+    def text_size(self, text):
+        """(right, bottom) of the text box, like ImageDraw.textbbox() at (0, 0)"""
+        _, _, w, h = create_font(self.pt).getbbox(text, 'L')
+        return w, h
+
+    def draw(self, draw, xy, text, fill):
+        draw.text(xy, text, font=create_font(self.pt), fill=fill)
+
+
+def get_font(pt):
+    """Text renderer for a point size: the glyph atlas if enabled and it has the size"""
+    if _atlas is not None:
+        font = _atlas.font(pt, FreeTypeText)
+        if font is not None:
+            return font
+    return FreeTypeText(pt)
+
+
+def use_text_renderer(name='freetype', atlas_path=None):
+    """Switch between FreeType and the pre-rasterized glyph atlas.
+
+    Returns the renderer in use; an atlas that is missing or was built
+    for another font or Pillow/FreeType version leaves FreeType on.
+    """
+    global _atlas
+    if name not in TEXT_RENDERERS:
+        raise ValueError(f"Unknown text renderer: {name}")
+    _atlas = None
+    if name == 'atlas':
+        from .glyph_atlas import GlyphAtlas
+        from .logs import event
+        path = atlas_path or default_atlas_path
+        try:
+            _atlas = GlyphAtlas.load(path, font_file_path)
+        except (OSError, ValueError) as e:
+            event('glyph_atlas_unavailable', path=path, error=str(e))
+            return 'freetype'
+    return name
@@ -0,0 +1,177 @@
+"""Serve pre-packed panel frames over HTTP for boards that cannot run PIL.
+
+    GET /profiles                  JSON list of profile names
+    GET /frames/<profile>/<page>   packed 1-bit frame for that page (profile URL-encoded)
+
+Frames carry an ETag. A client that sends it back in If-None-Match gets
+a 304 with no body while the frame is unchanged. Rendered frames are
+cached per (profile, page, day) and re-checked every max_age seconds,
+so a wall of polling clients costs a dictionary lookup per request.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .cache import get_cache
+from .panel import pack_frame
+from .screen_ui import ScreenUI
+
+PAGE_COUNT = 4
+
+_frame_cache = get_cache('frames', sizeof=lambda entry: len(entry[1]), max_entries=256)
+
+
+def frame_etag(body):
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+class FrameSource:
+    """Renders and caches packed frames for a set of profiles"""
+
+    def __init__(self, profiles, panel_width, panel_height, max_age=600):
+        self.panel_width = panel_width
+        self.panel_height = panel_height
+        self.max_age = max_age
+        self._uis = {}
+        for profile in profiles:
+            screen_ui = ScreenUI(panel_height, panel_width, profile.create_pregnancy(),
+                                 appointments_path=profile.appointments_path)
+            self._uis[profile.name] = (screen_ui, threading.Lock())
+
+    @property
+    def profile_names(self):
+        return list(self._uis)
+
+    def get_frame(self, profile_name, page):
+        """(etag, body) for a page; raises KeyError for unknown profiles"""
+        screen_ui, lock = self._uis[profile_name]
+        key = (profile_name, page, screen_ui.pregnancy.get_pregnancy_day())
+        entry = _frame_cache.get(key)
+        if entry is not None and time.monotonic() - entry[2] < self.max_age:
+            return entry[0], entry[1]
+
+        with lock:
+            screen_ui.set_page(page)
+            body = pack_frame(screen_ui.draw(), self.panel_width, self.panel_height)
+        etag = frame_etag(body)
+        _frame_cache.put(key, (etag, body, time.monotonic()))
+        return etag, body
+
+
+def etag_matches(header, etag):
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    candidates = [tag.strip() for tag in header.split(',')]
+    return etag in candidates or f'W/{etag}' in candidates
+
+
+class FrameRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        # Split before unquoting, so a "/" inside a profile name stays in its segment
+        parts = [urllib.parse.unquote(part) for part in self.path.split('?')[0].split('/') if part]
+        if parts == ['profiles']:
+            self._send(200, json.dumps(self.server.source.profile_names).encode(), 'application/json')
+        elif len(parts) == 3 and parts[0] == 'frames' and parts[2].isdigit():
+            self._send_frame(parts[1], int(parts[2]))
+        else:
+            self._send(404, b'Not found\n', 'text/plain')
+
+    def _send_frame(self, profile_name, page):
+        source = self.server.source
+        if page >= PAGE_COUNT:
+            self._send(404, b'Unknown page\n', 'text/plain')
+            return
+        try:
+            etag, body = source.get_frame(profile_name, page)
+        except KeyError:
+            self._send(404, b'Unknown profile\n', 'text/plain')
+            return
+
+        headers = {
+            'ETag': etag,
+            'Cache-Control': f'max-age={source.max_age}',
+            'X-Frame-Width': str(source.panel_width),
+            'X-Frame-Height': str(source.panel_height),
+        }
+        if etag_matches(self.headers.get('If-None-Match'), etag):
+            self._send(304, b'', None, headers)
+        else:
+            self._send(200, body, 'application/octet-stream', headers)
+
+    def _send(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if content_type:
+            self.send_header('Content-Type', content_type)
+        if status != 304:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.debug("frame server: " + format, *args)
+
+
+class FrameServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, source, host='127.0.0.1', port=8642):
+        super().__init__((host, port), FrameRequestHandler)
+        self.source = source
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start_background(self):
+        thread = threading.Thread(target=self.serve_forever, name='frame-server', daemon=True)
+        thread.start()
+        return thread
+
+
+class FrameClient:
+    """Polls a frame server the way a display board would.
+
+    Remembers the last ETag per frame and only downloads changed frames.
+    """
+
+    def __init__(self, base_url, timeout=5):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self._frames = {}
+        self.not_modified = 0
+
+    def profiles(self):
+        with urllib.request.urlopen(f'{self.base_url}/profiles', timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+    def fetch(self, profile_name, page):
+        """Return (changed, body) for a frame"""
+        key = (profile_name, page)
+        quoted = urllib.parse.quote(profile_name, safe='')
+        request = urllib.request.Request(f'{self.base_url}/frames/{quoted}/{page}')
+        if key in self._frames:
+            request.add_header('If-None-Match', self._frames[key][0])
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                body = response.read()
+                self._frames[key] = (response.headers['ETag'], body)
+                return True, body
+        except urllib.error.HTTPError as e:
+            if e.code != 304:
+                raise
+            self.not_modified += 1
+            return False, self._frames[key][1]
@@ -0,0 +1,206 @@
+"""Pre-rasterized glyph atlas, drawn without FreeType.
+
+build_glyph_atlas.py rasterizes every character the pages use at every
+point size the layouts need, once, with the same FreeType and Pillow
+calls that ImageDraw.text() makes. It stores the trimmed 8-bit glyph
+masks with their offsets, advances and boxes in one compressed file.
+
+AtlasFont places those masks the way Pillow's basic text layout does.
+Pen positions are whole-pixel hinted advances, the fractional part of
+the position rounds in 1/64 px units, and where anti-aliased edges of
+neighbouring glyphs overlap they are merged as a + b - a*b/255. The
+result matches ImageDraw.text() pixel for pixel, and the build script
+checks that. Strings with a character that isn't in the atlas fall
+back to FreeType.
+
+An atlas only fits the font file and the FreeType/Pillow versions it
+was built with; load() refuses anything else.
+"""
+import hashlib
+import json
+import os
+import struct
+import zlib
+
+import PIL
+from PIL import Image, features
+
+MAGIC = b'PTGA\0\0'
+ATLAS_VERSION = 1
+HEADER = struct.Struct('<6sHI')  # magic, version, index bytes
+
+def _blend(a, b):
+    """Pillow's merge of overlapping glyph masks: a + b - a*b/255, rounded"""
+    out = bytearray(b)
+    for i, x in enumerate(a):
+        if x:
+            y = out[i]
+            tmp = x * y + 128
+            out[i] = x + y - (((tmp >> 8) + tmp) >> 8)
+    return bytes(out)
+
+
+def font_digest(font_path):
+    with open(font_path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def environment():
+    """The rasterizer versions an atlas depends on"""
+    return {'freetype': features.version('freetype2'), 'pillow': PIL.__version__}
+
+
+def build_atlas(font_path, charsets):
+    """Atlas file contents; charsets maps point size to the characters it needs"""
+    from PIL import ImageFont
+
+    blob = bytearray()
+    index = {}
+    for pt, chars in sorted(charsets.items()):
+        font = ImageFont.truetype(font_path, pt)
+        glyphs = {}
+        for ch in sorted(set(chars)):
+            mask, (x, y) = font.getmask2(ch, 'L')
+            glyph = Image.frombytes('L', mask.size, bytes(mask))
+            trim = glyph.getbbox()
+            if trim:
+                glyph = glyph.crop(trim)
+                x, y = x + trim[0], y + trim[1]
+                w, h = glyph.size
+            else:
+                w = h = 0
+            advance = font.getlength(ch)
+            if advance != int(advance):
+                raise ValueError(f"{pt}pt {ch!r} has a fractional advance; hinting is off?")
+            glyphs[ch] = [len(blob), w, h, x, y, int(advance)] + list(font.getbbox(ch, 'L'))
+            blob.extend(glyph.tobytes())
+        index[str(pt)] = glyphs
+    header = dict(environment(), version=ATLAS_VERSION, font=font_digest(font_path), sizes=index)
+    header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    return HEADER.pack(MAGIC, ATLAS_VERSION, len(header_bytes)) + header_bytes + zlib.compress(bytes(blob), 9)
+
+
+def write_atlas(path, font_path, charsets):
+    data = build_atlas(font_path, charsets)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return len(data)
+
+
+class GlyphAtlas:
+    def __init__(self, index, blob):
+        self.index = index
+        self.blob = blob
+        self._fonts = {}
+
+    @classmethod
+    def load(cls, path, font_path):
+        """Load an atlas; ValueError if it doesn't match this font and Pillow"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        try:
+            magic, version, index_len = HEADER.unpack_from(data)
+        except struct.error:
+            raise ValueError(f"{path} is not a glyph atlas")
+        if magic != MAGIC or version != ATLAS_VERSION:
+            raise ValueError(f"{path} is not a glyph atlas")
+        header = json.loads(data[HEADER.size:HEADER.size + index_len].decode('utf-8'))
+        built = {key: header.get(key) for key in environment()}
+        if built != environment():
+            raise ValueError(f"{path} was built with {built}, running {environment()}; rebuild it")
+        if header['font'] != font_digest(font_path):
+            raise ValueError(f"{path} was built from a different font file; rebuild it")
+        blob = zlib.decompress(data[HEADER.size + index_len:])
+        return cls({int(pt): glyphs for pt, glyphs in header['sizes'].items()}, blob)
+
+    def sizes(self):
+        return sorted(self.index)
+
+    def font(self, pt, fallback=None):
+        """AtlasFont for a point size, or None if the atlas lacks it"""
+        font = self._fonts.get(pt)
+        if font is None and pt in self.index:
+            font = self._fonts[pt] = AtlasFont(pt, self.index[pt], self.blob, fallback)
+        return font
+
+    def nbytes(self):
+        return len(self.blob)
+
+
+class AtlasFont:
+    """Text measurement and drawing from atlas glyphs at one size"""
+
+    __slots__ = ('pt', 'metrics', 'blob', 'fallback', '_images')
+
+    def __init__(self, pt, metrics, blob, fallback=None):
+        self.pt = pt
+        self.metrics = metrics
+        self.blob = blob
+        self.fallback = fallback  # called with pt for strings the atlas can't draw
+        self._images = {}
+
+    def covers(self, text):
+        metrics = self.metrics
+        return all(ch in metrics for ch in text)
+
+    def _image(self, ch, m):
+        image = self._images.get(ch)
+        if image is None:
+            offset, w, h = m[0], m[1], m[2]
+            image = self._images[ch] = Image.frombytes('L', (w, h), self.blob[offset:offset + w * h])
+        return image
+
+    def text_size(self, text):
+        """(right, bottom) of the text box, like ImageDraw.textbbox() at (0, 0)"""
+        if not self.covers(text):
+            return self.fallback(self.pt).text_size(text)
+        if not text:
+            return 0, 0
+        pen = 0
+        right = bottom = None
+        for ch in text:
+            m = self.metrics[ch]
+            r, b = pen + m[8], m[9]
+            right = r if right is None else max(right, r)
+            bottom = b if bottom is None else max(bottom, b)
+            pen += m[5]
+        return right, bottom
+
+    def draw(self, draw, xy, text, fill):
+        """Draw text with its top-left anchor at xy, like ImageDraw.text()"""
+        x, y = xy
+        if not self.covers(text) or x < 0 or y < 0:
+            return self.fallback(self.pt).draw(draw, xy, text, fill)
+
+        # Whole pixels plus the 1/64 px rounding Pillow applies to the start
+        origin_x = int(x) + ((int(x % 1 * 64 + 0.5) + 32) >> 6)
+        origin_y = int(y) + ((int(y % 1 * 64 + 0.5) + 31) >> 6)
+
+        placed = []
+        pen = 0
+        for ch in text:
+            m = self.metrics[ch]
+            if m[1] and m[2]:
+                placed.append((pen + m[3], m[4], m[1], m[2], self._image(ch, m)))
+            pen += m[5]
+        if not placed:
+            return
+        left = min(p[0] for p in placed)
+        top = min(p[1] for p in placed)
+        width = max(p[0] + p[2] for p in placed) - left
+        height = max(p[1] + p[3] for p in placed) - top
+
+        mask = Image.new('L', (width, height), 0)
+        boxes = []
+        for gx, gy, w, h, image in placed:
+            box = (gx - left, gy - top, gx - left + w, gy - top + h)
+            if any(box[0] < b[2] and b[0] < box[2] and box[1] < b[3] and b[1] < box[3] for b in boxes):
+                # Anti-aliased edges touch the previous glyphs
+                merged = _blend(mask.crop(box).tobytes(), image.tobytes())
+                mask.paste(Image.frombytes('L', (w, h), merged), box[:2])
+            else:
+                mask.paste(image, box[:2])
+            boxes.append(box)
+        draw.bitmap((origin_x + left, origin_y + top), mask, fill=fill)
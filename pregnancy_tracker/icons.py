@@ -1,7 +1,22 @@
 import os
-from PIL import ImageFont
+from PIL import Image
+
+from .cache import get_cache, image_size
 
 icons_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'res/icons')
 
 carriage_icon_path = os.path.join(icons_dir, 'carriage.png')
 moon_icon_path = os.path.join(icons_dir, 'moon.png')
+
+_icon_cache = get_cache('icons', sizeof=image_size)
+
+
+def load_icon(path, size=None):
+    """Load an icon once, optionally resized, and keep the decoded pixels cached"""
+    def _load():
+        with Image.open(path) as icon:
+            icon.load()
+            if size and size != icon.size:
+                return icon.resize(size, Image.LANCZOS)
+            return icon.copy()
+    return _icon_cache.get_or_create((path, size), _load)
@@ -0,0 +1,162 @@
+"""Screen layout solved once per panel size.
+
+The pages were designed on the 264x176 panel. Every position, box and
+font size here is that design scaled to the target size: horizontal
+offsets by width, vertical offsets by height and sizes (fonts, icons,
+line widths) by the smaller of the two. At 264x176 the result is exactly
+the original design.
+"""
+from .cache import get_cache
+from .fonts import get_font
+from .icons import carriage_icon_path, moon_icon_path, load_icon
+
+BASE_WIDTH = 264
+BASE_HEIGHT = 176
+
+# Strings measured to place the title underline
+TITLE_SAMPLE = "New Foley Progress"
+APPOINTMENTS_TITLE = "Coming Up"
+
+_layout_cache = get_cache('layouts', sizeof=lambda layout: 2048, max_entries=16)
+
+
+def _text_height(text, pt):
+    return get_font(pt).text_size(text)[1]
+
+
+class Layout:
+    """Boxes, offsets and font sizes for one (width, height)"""
+
+    __slots__ = (
+        'width', 'height', 'sx', 'sy', 'scale',
+        # shared title and underline
+        'title_pt', 'title_y', 'line_y', 'line_x1', 'line_x2', 'line_width',
+        # progress page
+        'percent_pt', 'percent_y', 'weekday_pt', 'weekday_margin_bottom',
+        'moon_circle', 'moon_icon_size', 'moon_icon_pos',
+        'carriage_circle', 'carriage_icon_size', 'carriage_icon_pos',
+        'bar_x1', 'bar_x2', 'bar_y1', 'bar_y2', 'bar_y_center', 'bar_knob_size',
+        # size page
+        'left_column_x', 'right_column_x', 'content_y',
+        'week_label_pt', 'week_num_pt', 'week_num_y',
+        'divider_x', 'divider_y2', 'divider_width',
+        'size_label_pt', 'size_pts', 'size_max_width',
+        'size_line1_y', 'size_line2_y', 'size_single_y',
+        'length_pt', 'length_two_line_y', 'length_single_y',
+        # appointments page
+        'appt_line_y', 'appt_datetime_pt', 'appt_datetime_y',
+        'appt_type_pt', 'appt_type_y', 'appt_type_spacing', 'appt_type_max_width', 'appt_type_max_lines',
+        'no_appt_pt',
+        # milestones page
+        'weight_label_pt', 'weight_label_y', 'weight_pt', 'weight_y',
+        'dev_label_pt', 'dev_label_y', 'dev_pt', 'dev_y', 'dev_spacing', 'dev_max_width', 'dev_max_lines',
+    )
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.sx = width / BASE_WIDTH
+        self.sy = height / BASE_HEIGHT
+        self.scale = min(self.sx, self.sy)
+
+        x, y, size, pt = self._x, self._y, self._size, self._pt
+
+        self.title_pt = pt(20)
+        self.title_y = y(8)
+        title_h = _text_height(TITLE_SAMPLE, self.title_pt)
+        self.line_y = self.title_y + title_h + y(6)
+        self.line_x1 = x(20)
+        self.line_x2 = width - x(20)
+        self.line_width = size(2)
+
+        # Progress page
+        self.percent_pt = pt(36)
+        self.percent_y = self.title_y + title_h + y(18)
+        self.weekday_pt = pt(30)
+        self.weekday_margin_bottom = y(16)
+
+        circle = size(40)
+        margin = x(8)
+        self.bar_y_center = y(105)
+        circle_y1 = int(self.bar_y_center - circle/2)
+        self.moon_circle = (margin, circle_y1, margin + circle, circle_y1 + circle)
+        self.carriage_circle = (width - circle - margin, circle_y1, width - margin, circle_y1 + circle)
+        self.moon_icon_size, self.moon_icon_pos = self._icon_box(moon_icon_path, self.moon_circle, circle)
+        self.carriage_icon_size, self.carriage_icon_pos = self._icon_box(
+            carriage_icon_path, self.carriage_circle, circle)
+
+        bar_height = size(10)
+        self.bar_x1 = margin + circle
+        self.bar_x2 = width - margin - circle
+        self.bar_y1 = int(self.bar_y_center - bar_height/2)
+        self.bar_y2 = self.bar_y1 + bar_height
+        self.bar_knob_size = bar_height
+
+        # Size comparison page
+        self.left_column_x = width * 0.18
+        self.right_column_x = width * 0.65
+        self.content_y = self.line_y + y(20)
+        self.week_label_pt = pt(18)
+        self.week_num_pt = pt(60)
+        self.week_num_y = self.content_y + y(22)
+        self.divider_x = width * 0.36
+        self.divider_y2 = self.content_y + y(90)
+        self.divider_width = size(2)
+        self.size_label_pt = pt(16)
+        # Used for long (> 14 chars), medium (> 10 chars) and short names
+        self.size_pts = (pt(18), pt(20), pt(22))
+        self.size_max_width = width * 0.64 - x(15)
+        self.size_line1_y = self.content_y + y(22)
+        self.size_line2_y = self.content_y + y(44)
+        self.size_single_y = self.content_y + y(30)
+        self.length_pt = pt(18)
+        self.length_two_line_y = self.content_y + y(68)
+        self.length_single_y = self.content_y + y(56)
+
+        # Appointments page, which has its own title
+        self.appt_line_y = self.title_y + _text_height(APPOINTMENTS_TITLE, self.title_pt) + y(6)
+        self.appt_datetime_pt = pt(24)
+        self.appt_datetime_y = self.appt_line_y + y(20)
+        self.appt_type_pt = pt(16)
+        self.appt_type_y = self.appt_line_y + y(50)
+        self.appt_type_spacing = y(22)
+        self.appt_type_max_width = width - x(30)
+        self.appt_type_max_lines = 3
+        self.no_appt_pt = pt(18)
+
+        # Milestones page
+        self.weight_label_pt = pt(13)
+        self.weight_label_y = self.line_y + y(20)
+        self.weight_pt = pt(16)
+        self.weight_y = self.line_y + y(38)
+        self.dev_label_pt = pt(13)
+        self.dev_label_y = self.line_y + y(70)
+        self.dev_pt = pt(13)
+        self.dev_y = self.line_y + y(88)
+        self.dev_spacing = y(16)
+        self.dev_max_width = width - x(16)
+        self.dev_max_lines = 4
+
+    def _x(self, value):
+        return round(value * self.sx)
+
+    def _y(self, value):
+        return round(value * self.sy)
+
+    def _size(self, value):
+        return max(1, round(value * self.scale))
+
+    def _pt(self, value):
+        return max(6, round(value * self.scale))
+
+    def _icon_box(self, path, circle_box, circle):
+        icon = load_icon(path)
+        icon_size = (self._size(icon.width), self._size(icon.height))
+        x1, y1 = circle_box[:2]
+        pos = (int(x1 + (circle - icon_size[0])/2), int(y1 + (circle - icon_size[1])/2))
+        return icon_size, pos
+
+
+def get_layout(width, height):
+    """Layout for a panel size, solved on first use and then cached"""
+    return _layout_cache.get_or_create((width, height), lambda: Layout(width, height))
@@ -0,0 +1,229 @@
+"""One logging setup for every entry point.
+
+Records are handed to a bounded queue and written by a background
+listener thread, so logging never blocks rendering or a refresh. Each
+line written is a JSON object. Repeated messages from the same call
+site are rate limited, so a fault that repeats every refresh doesn't
+flood journald (and the SD card). Every record, limited or not, also
+goes into an in-memory ring buffer. dump() writes the ring buffer out
+and main.py calls it on SIGUSR2.
+
+Use event() for structured records:
+
+    event('refresh', render_seconds=0.12, page=1)
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+
+DEFAULT_LEVEL = 'INFO'
+
+_plain = logging.Formatter()
+_pipeline = None
+_setup_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', None) or {})
+        if getattr(record, 'suppressed', 0):
+            entry['suppressed'] = record.suppressed
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """Token bucket per call site: `burst` records, then `rate` per second.
+
+    The next record let through after a quiet spell carries a
+    `suppressed` count of what was dropped in between.
+    """
+
+    def __init__(self, rate=1 / 60, burst=5, max_sites=256, clock=time.monotonic):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.max_sites = max_sites
+        self.clock = clock
+        self.suppressed = 0
+        self._buckets = OrderedDict()  # (path, line) -> [tokens, last, suppressed]
+
+    def filter(self, record):
+        now = self.clock()
+        site = (record.pathname, record.lineno)
+        bucket = self._buckets.get(site)
+        if bucket is None:
+            bucket = self._buckets[site] = [self.burst, now, 0]
+            if len(self._buckets) > self.max_sites:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(site)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        if bucket[0] < 1:
+            bucket[2] += 1
+            self.suppressed += 1
+            return False
+        bucket[0] -= 1
+        record.suppressed = bucket[2]
+        bucket[2] = 0
+        return True
+
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the last `capacity` formatted records in memory"""
+
+    def __init__(self, capacity=256):
+        super().__init__()
+        self.records = deque(maxlen=capacity)
+
+    def emit(self, record):
+        try:
+            self.records.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+    def snapshot(self):
+        with self.lock:
+            return list(self.records)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that counts and drops records when the queue is full"""
+
+    dropped = 0
+
+    def prepare(self, record):
+        # Like the stock prepare(), but keep the traceback separate from the message
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _plain.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogPipeline:
+    def __init__(self, level, stream, rate, burst, ring_size, max_queue):
+        formatter = JsonFormatter()
+        self.output = logging.StreamHandler(stream)
+        self.output.setFormatter(formatter)
+        self.output.setLevel(level)
+        self.limiter = RateLimitFilter(rate, burst)
+        self.output.addFilter(self.limiter)
+        self.ring = RingBufferHandler(ring_size)
+        self.ring.setFormatter(formatter)
+
+        self.queue = queue.Queue(max_queue)
+        self.handler = DroppingQueueHandler(self.queue)
+        self.listener = logging.handlers.QueueListener(
+            self.queue, self.output, self.ring, respect_handler_level=True)
+
+    def start(self):
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(self.handler)
+        # The ring buffer keeps INFO even when the output only shows warnings
+        root.setLevel(min(self.output.level, logging.INFO))
+        self.listener.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        if self.listener._thread is not None:
+            self.listener.stop()
+
+    def set_level(self, level):
+        self.output.setLevel(level)
+        logging.getLogger().setLevel(min(self.output.level, logging.INFO))
+
+    def dump(self, path=None):
+        """Write the ring buffer to path (or stderr), oldest record first"""
+        lines = self.ring.snapshot()
+        stats = {'dump': len(lines), 'dropped': self.handler.dropped,
+                 'suppressed': self.limiter.suppressed}
+        text = '\n'.join(lines + [json.dumps(stats)]) + '\n'
+        if path is None:
+            sys.stderr.write(text)
+            sys.stderr.flush()
+        else:
+            with open(path, 'w') as f:
+                f.write(text)
+        return len(lines)
+
+
+def setup_logging(level=None, stream=None, rate=1 / 60, burst=5, ring_size=256, max_queue=1000):
+    """Install the logging pipeline once and return it.
+
+    Later calls return the same pipeline; passing a level to one of them
+    changes the output level, so a config file can override the default.
+    """
+    global _pipeline
+    with _setup_lock:
+        if _pipeline is None:
+            _pipeline = LogPipeline(level or DEFAULT_LEVEL, stream or sys.stderr,
+                                    rate, burst, ring_size, max_queue)
+            _pipeline.start()
+        elif level is not None:
+            _pipeline.set_level(level)
+        return _pipeline
+
+
+def setup_worker_logging(level=None, stream=None):
+    """Log straight to stderr from a pool worker process.
+
+    A forked worker inherits the queue handler but not the listener
+    thread, so records put on the queue would never be written.
+    """
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(JsonFormatter())
+    handler.addFilter(RateLimitFilter())
+    root = logging.getLogger()
+    for old in list(root.handlers):
+        root.removeHandler(old)
+    root.addHandler(handler)
+    root.setLevel(level or DEFAULT_LEVEL)
+
+
+def log_level():
+    """The output level of the pipeline, for passing on to worker processes"""
+    return _pipeline.output.level if _pipeline is not None else DEFAULT_LEVEL
+
+
+def event(name, level=logging.INFO, logger=None, exc_info=None, **fields):
+    """Log a structured event; fields become keys of the JSON line"""
+    fields['event'] = name
+    logging.getLogger(logger).log(level, name, exc_info=exc_info,
+                                  extra={'fields': fields}, stacklevel=2)
+
+
+def dump(path=None):
+    if _pipeline is not None:
+        return _pipeline.dump(path)
+    return 0
@@ -0,0 +1,34 @@
+"""Panel geometry and frame packing that match the Waveshare drivers."""
+
+# Native (width, height) of each supported panel, portrait as the driver reports it
+PANEL_SIZES = {
+    'epd2in7': (176, 264),
+    'epd2in7_V2': (176, 264),
+}
+
+
+def panel_size(model):
+    """Native (width, height) of a panel model"""
+    try:
+        return PANEL_SIZES[model]
+    except KeyError:
+        raise ValueError(f"Unknown panel model: {model}")
+
+
+def landscape_size(model):
+    """(width, height) that ScreenUI renders at for a panel model"""
+    width, height = panel_size(model)
+    return height, width
+
+
+def pack_frame(image, panel_width, panel_height):
+    """Pack an image into the 1 bit-per-pixel buffer the panel expects.
+
+    Same layout as the driver's getbuffer(): rows of MSB-first bits,
+    0 for black, landscape images rotated to the panel orientation.
+    """
+    if image.size == (panel_height, panel_width):
+        image = image.rotate(90, expand=True)
+    elif image.size != (panel_width, panel_height):
+        raise ValueError(f"Image size {image.size} does not fit a {panel_width}x{panel_height} panel")
+    return image.convert('1').tobytes('raw')
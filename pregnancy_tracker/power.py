@@ -0,0 +1,149 @@
+"""Power-aware refresh scheduling for battery builds.
+
+The panel controller is put to sleep straight after every refresh and
+only woken (re-initialised) when there is a new frame to show. Button
+presses that arrive while a refresh is pending are batched so only the
+last requested page is drawn. Between presses the caller can block for
+idle_window() seconds: the time until anything on screen can change.
+"""
+import hashlib
+import logging
+import math
+import time
+from datetime import datetime, timedelta
+
+from .logs import event
+
+# Progress is shown with one decimal, so the text changes every 0.1%
+PERCENT_STEPS = 1000
+
+DEFAULT_SETTINGS = {
+    'refresh_mode': 'full',    # 'fast' or 'partial' where the panel supports them
+    'refresh_watts': 0.0264,   # panel draw during a refresh (2.7" datasheet, typical)
+    'active_watts': 0.6,       # extra board draw while rendering (Pi Zero, one core busy)
+    'min_idle_seconds': 1.0,
+}
+
+
+class PowerManager:
+    def __init__(self, epd, screen_ui, settings=None, timer=time.monotonic):
+        self.epd = epd
+        self.screen_ui = screen_ui
+        self.settings = dict(DEFAULT_SETTINGS, **(settings or {}))
+        self.timer = timer
+        self.awake = False
+        self.last_digest = None
+        self.next_refresh_at = None
+        self._pending_page = None
+        self._started = timer()
+        self.counters = {
+            'renders': 0, 'refreshes': 0, 'skipped': 0, 'wakes': 0,
+            'render_seconds': 0.0, 'refresh_seconds': 0.0,
+        }
+
+    @property
+    def pregnancy(self):
+        return self.screen_ui.pregnancy
+
+    def request(self, page):
+        """Queue a page; only the most recent request is drawn"""
+        self._pending_page = page
+
+    def refresh_due(self):
+        return self.next_refresh_at is not None and self.pregnancy.clock() >= self.next_refresh_at
+
+    def has_work(self):
+        """True if flush() would render: a page was requested or the screen is due to change"""
+        return self._pending_page is not None or self.refresh_due()
+
+    def flush(self, force=False):
+        """Draw pending work, if any, then put the panel back to sleep.
+
+        Returns True when the panel was refreshed.
+        """
+        if not force and not self.has_work():
+            return False
+        if self._pending_page is not None:
+            self.screen_ui.set_page(self._pending_page)
+            self._pending_page = None
+
+        start = self.timer()
+        buffer = self.epd.getbuffer(self.screen_ui.draw())
+        render_seconds = self.timer() - start
+        self.counters['renders'] += 1
+        self.counters['render_seconds'] += render_seconds
+        self.next_refresh_at = self._next_boundary()
+        page = self.screen_ui.current_page
+
+        digest = hashlib.blake2b(buffer, digest_size=16).hexdigest()
+        if digest == self.last_digest and not force:
+            # Nothing visible changed, leave the panel asleep
+            self.counters['skipped'] += 1
+            event('refresh_skipped', level=logging.DEBUG, page=page,
+                  render_seconds=round(render_seconds, 4))
+            return False
+
+        self._wake()
+        start = self.timer()
+        self.epd.display(buffer, self.settings['refresh_mode'])
+        refresh_seconds = self.timer() - start
+        self.counters['refreshes'] += 1
+        self.counters['refresh_seconds'] += refresh_seconds
+        self.last_digest = digest
+        self.sleep()
+        event('refresh', page=page, render_seconds=round(render_seconds, 4),
+              refresh_seconds=round(refresh_seconds, 3),
+              energy_joules_per_day=round(self.metrics()['energy_joules_per_day'], 2))
+        return True
+
+    def clear(self):
+        """Wake the panel and clear it, e.g. at startup"""
+        self._wake('full')
+        self.epd.clear()
+
+    def sleep(self):
+        if self.awake:
+            self.epd.sleep()
+            self.awake = False
+
+    def _wake(self, mode=None):
+        # Initialised in the mode the next refresh uses, so the backend needn't init again
+        if not self.awake:
+            self.epd.init(mode or self.settings['refresh_mode'])
+            self.awake = True
+            self.counters['wakes'] += 1
+
+    def _next_boundary(self):
+        """When the current page can next look different.
+
+        Week, size, milestone and appointment pages only change at
+        midnight (an appointment drops off once its day has passed).
+        The progress page also changes with every 0.1% step.
+        """
+        now = self.pregnancy.clock()
+        boundary = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        if self.screen_ui.current_page == 0 and self.pregnancy.get_progress() < 1:
+            total = self.pregnancy.PREGNANCY_DURATION_DAYS * 86400
+            step = total / PERCENT_STEPS
+            elapsed = self.pregnancy.get_pregnancy_secs()
+            # "{:.1f}" rounds, so the text flips half way between steps
+            next_flip = (math.floor(elapsed / step - 0.5) + 1.5) * step
+            boundary = min(boundary, now + timedelta(seconds=next_flip - elapsed))
+        return boundary
+
+    def idle_window(self):
+        """Seconds the caller can sleep before the screen needs a refresh"""
+        if self.next_refresh_at is None:
+            return self.settings['min_idle_seconds']
+        remaining = (self.next_refresh_at - self.pregnancy.clock()).total_seconds()
+        return max(self.settings['min_idle_seconds'], remaining)
+
+    def metrics(self):
+        counters = dict(self.counters)
+        energy = (counters['refresh_seconds'] * self.settings['refresh_watts'] +
+                  counters['render_seconds'] * self.settings['active_watts'])
+        # Extrapolate from at least an hour so a fresh start doesn't look alarming
+        elapsed_days = max(self.timer() - self._started, 3600) / 86400
+        counters['energy_joules'] = energy
+        counters['energy_joules_per_day'] = energy / elapsed_days
+        return counters
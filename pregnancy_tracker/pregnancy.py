@@ -1,13 +1,16 @@
 import math
-import time
 from datetime import datetime, timedelta
 
 class Pregnancy:
     PREGNANCY_DURATION_DAYS = 280
 
-    def __init__(self, birth_date):
+    __slots__ = ('birth_date', 'pregnancy_start_date', 'clock')
+
+    def __init__(self, birth_date, clock=None):
         self.birth_date = datetime.strptime(birth_date, "%Y-%m-%d")
         self.pregnancy_start_date = self.birth_date - timedelta(days=self.PREGNANCY_DURATION_DAYS)
+        # Returns the current datetime; pass a fixed one to render a given day
+        self.clock = clock or datetime.now
 
     def get_progress(self):
         total_pregnancy_secs = self.birth_date.timestamp() - self.pregnancy_start_date.timestamp()
@@ -19,11 +22,14 @@ class Pregnancy:
     def get_percent_str(self):
         return "{:.1f}%".format(self.get_progress()*100)
 
+    def today(self):
+        return self.clock().date()
+
     def get_pregnancy_day(self):
-        return (datetime.now() - self.pregnancy_start_date).days
+        return (self.clock() - self.pregnancy_start_date).days
 
     def get_pregnancy_secs(self):
-        return time.time() - self.pregnancy_start_date.timestamp()
+        return self.clock().timestamp() - self.pregnancy_start_date.timestamp()
 
     def get_pregnancy_week(self):
         return math.floor(self.get_pregnancy_day()/7)
@@ -32,4 +38,4 @@ class Pregnancy:
         return math.floor(self.get_pregnancy_day())%7
     
     def get_days_until_due_date(self):
-        return (self.birth_date - datetime.now()).days
+        return (self.birth_date - self.clock()).days
@@ -0,0 +1,82 @@
+"""Tracked pregnancies ("profiles") and the displays that show them.
+
+A config with a single expected_birth_date is one profile on the main
+display. Several pregnancies are listed under "profiles":
+
+    {
+        "profiles": [
+            {"name": "twin-a", "expected_birth_date": "2025-05-15", "display": "main"},
+            {"name": "twin-b", "expected_birth_date": "2025-05-15",
+             "appointments": "appointments-b.json", "display": "main"}
+        ],
+        "displays": {
+            "main": {"model": "epd2in7_V2", "rotate_seconds": 60}
+        }
+    }
+
+Profiles that share a display are rotated through on it. An
+"appointments" file ending in .db is an appointment store holding many
+profiles' appointments; each profile reads the rows under its own name.
+"""
+import os
+
+from .appointment_store import is_store_path, store_source
+from .pregnancy import Pregnancy
+
+DEFAULT_DISPLAY = 'main'
+DEFAULT_MODEL = 'epd2in7_V2'
+
+
+class Profile:
+    __slots__ = ('name', 'expected_birth_date', 'appointments_path', 'display')
+
+    def __init__(self, name, expected_birth_date, appointments_path=None, display=DEFAULT_DISPLAY):
+        self.name = name
+        self.expected_birth_date = expected_birth_date
+        self.appointments_path = appointments_path
+        self.display = display
+
+    def create_pregnancy(self):
+        return Pregnancy(self.expected_birth_date)
+
+    def spec(self):
+        """Plain tuple form that can be sent to a worker process"""
+        return (self.name, self.expected_birth_date, self.appointments_path)
+
+    def __repr__(self):
+        return f"Profile({self.name!r}, {self.expected_birth_date!r}, display={self.display!r})"
+
+
+def load_profiles(config, base_dir):
+    """Build the list of profiles described by config"""
+    entries = config.get('profiles')
+    if not entries:
+        entries = [{'name': 'default', 'expected_birth_date': config['expected_birth_date']}]
+
+    profiles = []
+    for i, entry in enumerate(entries):
+        name = entry.get('name', f'profile-{i}')
+        appointments = entry.get('appointments')
+        if appointments and not os.path.isabs(appointments):
+            appointments = os.path.join(base_dir, appointments)
+        if appointments and is_store_path(appointments):
+            appointments = store_source(appointments, name)
+        profiles.append(Profile(
+            name,
+            entry['expected_birth_date'],
+            appointments,
+            entry.get('display', DEFAULT_DISPLAY),
+        ))
+    return profiles
+
+
+def load_displays(config, profiles):
+    """Display settings for every display referenced by a profile"""
+    configured = config.get('displays', {})
+    displays = {}
+    for profile in profiles:
+        if profile.display not in displays:
+            settings = {'model': DEFAULT_MODEL, 'rotate_seconds': 60}
+            settings.update(configured.get(profile.display, {}))
+            displays[profile.display] = settings
+    return displays
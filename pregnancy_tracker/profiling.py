@@ -0,0 +1,197 @@
+"""On-demand profiling of the running tracker.
+
+request() (main.py calls it on SIGUSR1 or when it finds the flag file)
+arms a profile of the next `renders` renders, or of `seconds` seconds,
+whichever ends first. The clock starts at the next poll() from the main
+loop. main.py wraps each render and refresh in capture(),
+so the time spent idle between button presses stays out of the profile,
+and ScreenUI.draw() and epd.display() are the bulk of what's in it.
+
+Two modes:
+
+- 'cprofile' records every call and writes a pstats file, to read with
+  `python3 -m pstats` or snakeviz.
+- 'sample' reads the main thread's stack every `interval` seconds from a
+  helper thread, the way py-spy does, and writes collapsed stacks
+  ("a;b;c count" lines) for flamegraph.pl or speedscope. The overhead
+  stays low on a Pi Zero, and so does the distortion.
+"""
+import cProfile
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+from .logs import event
+
+PROFILE_MODES = ('cprofile', 'sample')
+
+DEFAULT_SETTINGS = {
+    'mode': 'cprofile',
+    'renders': 10,
+    'seconds': 300,
+    'interval': 0.005,  # seconds between stack samples
+}
+
+# Shorter sampling intervals would just keep the sampler thread spinning
+MIN_INTERVAL = 0.001
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Counts the stacks a thread is seen in, while capturing is on"""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = max(interval, MIN_INTERVAL)
+        self.stacks = Counter()
+        self.capturing = False
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            if not self.capturing:
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            if names:
+                self.stacks[';'.join(reversed(names))] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class Profiler:
+    def __init__(self, out_dir, settings=None, clock=time.monotonic):
+        self.out_dir = out_dir
+        self.settings = dict(DEFAULT_SETTINGS, **(settings or {}))
+        self.clock = clock
+        self._requested = None
+        self._active = None  # settings of the profile being taken
+        self._profile = None
+        self._sampler = None
+        self._renders = 0
+        self._deadline = None
+        self.unsupported = None  # why profiles can't be taken in this process, if they can't
+
+    @property
+    def active(self):
+        return self._active is not None
+
+    def request(self, **overrides):
+        """Arm a profile; it starts at the next poll() or capture(). Safe in a signal handler."""
+        self._requested = dict(self.settings, **overrides)
+
+    def check_flag(self, path):
+        """Arm a profile if path exists; it may hold JSON overrides such as {"mode": "sample"}.
+
+        The overrides are checked like the "profiling" key in config.json.
+        A file that doesn't pass is removed and logged, and nothing is armed.
+        """
+        from .config import profiling_problems
+
+        try:
+            with open(path) as f:
+                text = f.read()
+            os.remove(path)
+        except OSError:
+            return False
+        try:
+            overrides = json.loads(text) if text.strip() else {}
+        except ValueError as e:
+            event('profile_flag_invalid', level=logging.WARNING, path=path, problems=[f"not valid JSON: {e}"])
+            return False
+        problems = profiling_problems(overrides, 'profile flag')
+        if problems:
+            event('profile_flag_invalid', level=logging.WARNING, path=path, problems=problems)
+            return False
+        self.request(**{key: overrides[key] for key in DEFAULT_SETTINGS if key in overrides})
+        return True
+
+    def _start(self):
+        settings, self._requested = self._requested, None
+        if self.unsupported:
+            event('profile_unsupported', level=logging.WARNING, reason=self.unsupported)
+            return
+        self._renders = 0
+        self._deadline = self.clock() + settings['seconds']
+        if settings['mode'] == 'sample':
+            self._sampler = StackSampler(threading.get_ident(), settings['interval'])
+        else:
+            self._profile = cProfile.Profile()
+        # Only active once there is something to write out
+        self._active = settings
+        event('profile_started', mode=self._active['mode'], renders=self._active['renders'],
+              seconds=self._active['seconds'])
+
+    @contextmanager
+    def capture(self):
+        """Profile the enclosed render; finish the profile once its budget is used"""
+        if self._requested is not None and self._active is None:
+            self._start()
+        if self._active is None:
+            yield
+            return
+        if self._sampler:
+            self._sampler.capturing = True
+        else:
+            self._profile.enable()
+        try:
+            yield
+        finally:
+            if self._sampler:
+                self._sampler.capturing = False
+            else:
+                self._profile.disable()
+            self._renders += 1
+            if self._renders >= self._active['renders'] or self.clock() >= self._deadline:
+                self.finish()
+
+    def poll(self):
+        """Start a requested profile, or finish one whose time is up without enough renders"""
+        if self._requested is not None and self._active is None:
+            self._start()
+        elif self._active is not None and self.clock() >= self._deadline:
+            self.finish()
+
+    def finish(self):
+        """Write out the profile taken so far; returns its path"""
+        if self._active is None:
+            return None
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        sampled = self._sampler is not None
+        path = os.path.join(self.out_dir, f"profile-{stamp}.{'folded' if sampled else 'prof'}")
+        if sampled:
+            self._sampler.stop()
+        try:
+            os.makedirs(self.out_dir, exist_ok=True)
+            if sampled:
+                self._sampler.write(path)
+            else:
+                self._profile.dump_stats(path)
+            event('profile_written', path=path, mode=self._active['mode'], renders=self._renders)
+        except OSError as e:
+            event('profile_write_failed', level=logging.ERROR, path=path, error=str(e))
+            path = None
+        self._active = self._profile = self._sampler = None
+        return path
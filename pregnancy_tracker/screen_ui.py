@@ -1,96 +1,101 @@
-import time
-import json
+import logging
 import os
-from datetime import datetime
 from PIL import Image, ImageDraw
 
-from .icons import carriage_icon_path, moon_icon_path
-from .fonts import create_font
+from .cache import get_cache, image_size
+from .icons import carriage_icon_path, moon_icon_path, load_icon
+from .fonts import get_font
+from .layout import get_layout
 from .gray_scale import WHITE, DARK_GRAY, BLACK, LIGHT_GRAY
-from .size_data import get_size_for_week
-from .developmental_milestones import get_milestone_for_week
+from .appointment_store import load_appointments
+from .day_index import DayIndex, compute_day, next_appointment
+from .logs import event
+
+default_appointments_path = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'appointments.json')
+
+# Rendered pages keyed by everything that shows up on them
+_page_cache = get_cache('pages', sizeof=image_size, max_entries=32)
 
 
 class ScreenUI:
-    ICON_SIZE = 20
-    ICON_CIRCLE_SIZE = 40
-    ICON_X_MARGIN = 8
-    PROGRESS_BAR_Y_CENTER = 105
-    PROGRESS_BAR_HEIGHT = 10
-    TEXT_MARGIN_TOP = 16
-    TEXT_MARGIN_BOTTOM = 16
-    TITLE_MARGIN_TOP = 8
-    PAGE_DOTS_MARGIN_BOTTOM = 8
-    PAGE_DOT_SIZE = 6
-    PAGE_DOT_SPACING = 12
+    __slots__ = ('pregnancy', 'width', 'height', 'current_page',
+                 'appointments', 'day_index', 'layout', '_img', '_img_draw')
 
-    def __init__(self, width, height, pregnancy, current_page=0):
+    def __init__(self, width, height, pregnancy, current_page=0, appointments_path=None, appointments=None,
+                 day_index=None):
         self.pregnancy = pregnancy
         self.width = width
         self.height = height
         self.current_page = current_page  # 0=progress, 1=size, 2=appointments, 3=milestones
+        # Positions and font sizes for this panel size, solved once and shared
+        self.layout = get_layout(width, height)
+        # One frame buffer for the lifetime of the UI, cleared before each draw
         self._img = Image.new('L', (self.width, self.height), 255)  # 255: clear the frame
         self._img_draw = ImageDraw.Draw(self._img)
-        self._load_appointments()
+        if appointments is not None:
+            self.appointments = appointments
+        else:
+            self._load_appointments(appointments_path or default_appointments_path)
+        # Built on first use unless a (possibly memory-mapped) one is passed in
+        self.day_index = day_index
+
+    def _day(self):
+        """Content for today: week, size, milestone and next appointment"""
+        if self.day_index is None:
+            self.day_index = DayIndex.build(self.pregnancy, self.appointments)
+        day = self.pregnancy.get_pregnancy_day()
+        entry = self.day_index.entry(day)
+        if entry is None:
+            # Before conception or long past the due date
+            entry = compute_day(day, next_appointment(self.appointments, self.pregnancy.today()))
+        return entry
 
     def _calculate_text_size(self, message, font):
-        _, _, w, h = self._img_draw.textbbox((0, 0), message, font=font)
-        return w, h
+        return font.text_size(message)
 
     def _draw_title(self):
-        font = create_font(20)
+        font = get_font(self.layout.title_pt)
         # For milestones page, show week-specific title
         if self.current_page == 3:
-            week = self.pregnancy.get_pregnancy_week()
-            title_str = f"Week {week} Milestones"
+            title_str = self._day().milestone_title
         else:
             title_str = "New Foley Tracker"
         w, h = self._calculate_text_size(title_str, font)
-        pos = ((self.width-w)/2, self.TITLE_MARGIN_TOP)
-        self._img_draw.text(pos, title_str, font=font, fill=BLACK)
+        pos = ((self.width-w)/2, self.layout.title_y)
+        font.draw(self._img_draw, pos, title_str, BLACK)
+
+    def _draw_title_line(self, line_y):
+        layout = self.layout
+        self._img_draw.line([(layout.line_x1, line_y), (layout.line_x2, line_y)],
+                            fill=BLACK, width=layout.line_width)
 
     def _draw_percent(self):
-        font = create_font(36)
+        font = get_font(self.layout.percent_pt)
         percent_str = self.pregnancy.get_percent_str()
         w, h = self._calculate_text_size(percent_str, font)
-        title_font = create_font(20)
-        _, title_h = self._calculate_text_size("New Foley Progress", title_font)
         # Adjust position to account for the decorative line
-        pos = ((self.width-w)/2, self.TITLE_MARGIN_TOP + title_h + 18)
-        self._img_draw.text(pos, percent_str, font=font, fill=BLACK)
+        pos = ((self.width-w)/2, self.layout.percent_y)
+        font.draw(self._img_draw, pos, percent_str, BLACK)
 
     def _draw_weekday(self):
-        font = create_font(30)
-        percent_str = self.pregnancy.get_weekday_str()
-        w, h = self._calculate_text_size(percent_str, font)
-        pos = ((self.width-w)/2, (self.height-h-self.TEXT_MARGIN_BOTTOM))
-        self._img_draw.text(pos, percent_str, font=font, fill=BLACK)
+        font = get_font(self.layout.weekday_pt)
+        weekday_str = self._day().weekday_str
+        w, h = self._calculate_text_size(weekday_str, font)
+        pos = ((self.width-w)/2, (self.height-h-self.layout.weekday_margin_bottom))
+        font.draw(self._img_draw, pos, weekday_str, BLACK)
 
     def _draw_carriage(self):
-        carriage = Image.open(carriage_icon_path)
-        carriage.convert("1")
-        circle_y1 = int(self.PROGRESS_BAR_Y_CENTER - self.ICON_CIRCLE_SIZE/2)
-        circle_y2 = circle_y1 + self.ICON_CIRCLE_SIZE
-        circle_x1 = self.width - self.ICON_CIRCLE_SIZE - self.ICON_X_MARGIN
-        circle_x2 = self.width - self.ICON_X_MARGIN
-        self._img_draw.ellipse((circle_x1, circle_y1, circle_x2, circle_y2), fill=DARK_GRAY)
-
-        icon_x = int(circle_x1 + (self.ICON_CIRCLE_SIZE - carriage.width)/2)
-        icon_y = int(circle_y1 + (self.ICON_CIRCLE_SIZE - carriage.height)/2)
-        self._img.paste(carriage, (icon_x, icon_y), carriage)
+        layout = self.layout
+        carriage = load_icon(carriage_icon_path, layout.carriage_icon_size)
+        self._img_draw.ellipse(layout.carriage_circle, fill=DARK_GRAY)
+        self._img.paste(carriage, layout.carriage_icon_pos, carriage)
 
     def _draw_moon(self):
-        moon = Image.open(moon_icon_path)
-        moon.convert("1")
-        circle_y1 = int(self.PROGRESS_BAR_Y_CENTER - self.ICON_CIRCLE_SIZE/2)
-        circle_y2 = circle_y1 + self.ICON_CIRCLE_SIZE
-        circle_x1 = self.ICON_X_MARGIN
-        circle_x2 = circle_x1 + self.ICON_CIRCLE_SIZE
-        self._img_draw.ellipse((circle_x1, circle_y1, circle_x2, circle_y2), fill=LIGHT_GRAY)
-
-        icon_x = int(circle_x1 + (self.ICON_CIRCLE_SIZE - moon.width)/2)
-        icon_y = int(circle_y1 + (self.ICON_CIRCLE_SIZE - moon.height)/2)
-        self._img.paste(moon, (icon_x, icon_y), moon)
+        layout = self.layout
+        moon = load_icon(moon_icon_path, layout.moon_icon_size)
+        self._img_draw.ellipse(layout.moon_circle, fill=LIGHT_GRAY)
+        self._img.paste(moon, layout.moon_icon_pos, moon)
 
     def _draw_progress_bar_mid(self):
         self._draw_progress_done()
@@ -102,17 +107,17 @@ class ScreenUI:
         self._draw_progress_bar_mid()
         self._draw_carriage()
 
-    def _load_appointments(self):
-        """Load appointments from JSON file"""
+    def reload_appointments(self, appointments_path=None):
+        """Re-read the appointments file, e.g. after config.json changed"""
+        self._load_appointments(appointments_path or default_appointments_path)
+        self.day_index = None
+
+    def _load_appointments(self, appointments_path):
+        """Load appointments from a JSON file or the appointment store"""
         try:
-            appointments_path = os.path.join(
-                os.path.dirname(os.path.dirname(os.path.realpath(__file__))),
-                'appointments.json'
-            )
-            with open(appointments_path, 'r') as f:
-                data = json.load(f)
-                self.appointments = data.get('appointments', [])
-        except Exception as e:
+            self.appointments = load_appointments(appointments_path)
+        except Exception:
+            event('appointments_unreadable', level=logging.WARNING, path=appointments_path, exc_info=True)
             self.appointments = []
     
     def set_page(self, page_num):
@@ -122,65 +127,63 @@ class ScreenUI:
 
     def _draw_size_comparison(self):
         """Draw the size comparison screen with two-column layout"""
-        week = self.pregnancy.get_pregnancy_week()
-        size_comparison, size_length = get_size_for_week(week)
-        
-        title_font = create_font(20)
-        _, title_h = self._calculate_text_size("New Foley Progress", title_font)
+        layout = self.layout
+        entry = self._day()
+        week = entry.week
+        size_comparison, size_length = entry.size_comparison, entry.size_length
         
         # Line is already drawn in main draw() method
-        line_y = self.TITLE_MARGIN_TOP + title_h + 6
-        
-        # Define column positions - moved divider left for more space on right
-        left_column_x = self.width * 0.18  # 18% from left (was 25%)
-        right_column_x = self.width * 0.65  # 65% from left (was 75%)
-        content_start_y = line_y + 20
+        # Column positions - divider sits left of center for more space on right
+        left_column_x = layout.left_column_x
+        right_column_x = layout.right_column_x
+        content_start_y = layout.content_y
         
         # LEFT COLUMN - Week information
         # Draw week label (bigger, darker)
-        week_label_font = create_font(18)  # Increased from 14
+        week_label_font = get_font(layout.week_label_pt)
         week_label = "WEEK"
         w, h = self._calculate_text_size(week_label, week_label_font)
         pos = (left_column_x - w/2, content_start_y)
-        self._img_draw.text(pos, week_label, font=week_label_font, fill=BLACK)  # Changed to BLACK
+        week_label_font.draw(self._img_draw, pos, week_label, BLACK)
         
         # Draw week number (large, bold)
-        week_num_font = create_font(60)  # Increased from 54
+        week_num_font = get_font(layout.week_num_pt)
         week_num_str = str(week)
         w, h = self._calculate_text_size(week_num_str, week_num_font)
-        pos = (left_column_x - w/2, content_start_y + 22)
-        self._img_draw.text(pos, week_num_str, font=week_num_font, fill=BLACK)
+        pos = (left_column_x - w/2, layout.week_num_y)
+        week_num_font.draw(self._img_draw, pos, week_num_str, BLACK)
         
-        # Draw vertical divider line - moved left to match new column layout
-        divider_x = self.width * 0.36  # Moved left (was 0.5)
+        # Draw vertical divider line
+        divider_x = layout.divider_x
         self._img_draw.line(
-            [(divider_x, content_start_y), (divider_x, content_start_y + 90)],  # Extended line
+            [(divider_x, content_start_y), (divider_x, layout.divider_y2)],
             fill=BLACK, 
-            width=2
+            width=layout.divider_width
         )
         
         # RIGHT COLUMN - Size information
         # Draw "Baby size" label
-        size_label_font = create_font(16)  # Increased from 11
+        size_label_font = get_font(layout.size_label_pt)
         size_label = "BABY SIZE"
         w, h = self._calculate_text_size(size_label, size_label_font)
         pos = (right_column_x - w/2, content_start_y)
-        self._img_draw.text(pos, size_label, font=size_label_font, fill=BLACK)  # Changed to BLACK
+        size_label_font.draw(self._img_draw, pos, size_label, BLACK)
         
         # Draw size comparison
         size_str = size_comparison.upper()
         
-        # Dynamically adjust font size based on text length (all increased)
+        # Dynamically adjust font size based on text length to prevent overflow
+        long_pt, medium_pt, short_pt = layout.size_pts
         if len(size_str) > 14:
-            size_font = create_font(18)  # Reduced to prevent overflow
+            size_font = get_font(long_pt)
         elif len(size_str) > 10:
-            size_font = create_font(20)  # Reduced to prevent overflow
+            size_font = get_font(medium_pt)
         else:
-            size_font = create_font(22)  # Reduced to prevent overflow
+            size_font = get_font(short_pt)
         
         # Check if we need to break into two lines
         w, h = self._calculate_text_size(size_str, size_font)
-        max_width = self.width * 0.64 - 15  # Adjusted for new column layout (64% of width minus margin)
+        max_width = layout.size_max_width
         
         if w > max_width and ' ' in size_comparison:
             # Break into two lines
@@ -196,204 +199,178 @@ class ScreenUI:
             w1, h1 = self._calculate_text_size(line1, size_font)
             w2, h2 = self._calculate_text_size(line2, size_font)
             
-            pos1 = (right_column_x - w1/2, content_start_y + 22)
-            pos2 = (right_column_x - w2/2, content_start_y + 44)
+            pos1 = (right_column_x - w1/2, layout.size_line1_y)
+            pos2 = (right_column_x - w2/2, layout.size_line2_y)
             
-            self._img_draw.text(pos1, line1, font=size_font, fill=BLACK)
-            self._img_draw.text(pos2, line2, font=size_font, fill=BLACK)
+            size_font.draw(self._img_draw, pos1, line1, BLACK)
+            size_font.draw(self._img_draw, pos2, line2, BLACK)
             
-            length_y = content_start_y + 68
+            length_y = layout.length_two_line_y
         else:
             # Single line
             w, h = self._calculate_text_size(size_str, size_font)
-            pos = (right_column_x - w/2, content_start_y + 30)
-            self._img_draw.text(pos, size_str, font=size_font, fill=BLACK)
-            length_y = content_start_y + 56
+            pos = (right_column_x - w/2, layout.size_single_y)
+            size_font.draw(self._img_draw, pos, size_str, BLACK)
+            length_y = layout.length_single_y
         
         # Draw length (bigger and darker)
-        length_font = create_font(18)  # Increased from 14
+        length_font = get_font(layout.length_pt)
         w, h = self._calculate_text_size(size_length, length_font)
         pos = (right_column_x - w/2, length_y)
-        self._img_draw.text(pos, size_length, font=length_font, fill=BLACK)  # Changed to BLACK
+        length_font.draw(self._img_draw, pos, size_length, BLACK)
     
+    def _wrap_text(self, text, font, max_width):
+        """Split text into lines no wider than max_width"""
+        lines = []
+        current_line = ""
+        for word in text.split():
+            test_line = current_line + " " + word if current_line else word
+            test_w, _ = self._calculate_text_size(test_line, font)
+            if test_w <= max_width:
+                current_line = test_line
+            else:
+                if current_line:
+                    lines.append(current_line)
+                current_line = word
+        if current_line:
+            lines.append(current_line)
+        return lines
+
     def _draw_appointments_page(self):
         """Draw the appointments page showing next upcoming appointment"""
+        layout = self.layout
         # Draw "Coming Up" as the title instead of "New Foley Tracker"
-        title_font = create_font(20)
+        title_font = get_font(layout.title_pt)
         title_str = "Coming Up"
         w, h = self._calculate_text_size(title_str, title_font)
-        pos = ((self.width-w)/2, self.TITLE_MARGIN_TOP)
-        self._img_draw.text(pos, title_str, font=title_font, fill=BLACK)
+        pos = ((self.width-w)/2, layout.title_y)
+        title_font.draw(self._img_draw, pos, title_str, BLACK)
         
         # Draw the decorative line
-        _, title_h = self._calculate_text_size(title_str, title_font)
-        line_y = self.TITLE_MARGIN_TOP + title_h + 6
-        self._img_draw.line([(20, line_y), (self.width - 20, line_y)], fill=BLACK, width=2)
+        self._draw_title_line(layout.appt_line_y)
         
         # Get next appointment
-        next_appointment = self._get_next_appointment()
+        entry = self._day()
         
-        if next_appointment:
-            # Parse and format date
-            appt_date = datetime.strptime(next_appointment['date'], '%Y-%m-%d')
-            date_str = appt_date.strftime('%b %d').upper()  # Shortened format like "AUG 15"
-            
-            # Draw date and time in larger font on same line (moved up for more room)
-            datetime_font = create_font(24)
-            datetime_str = f"{date_str} • {next_appointment['time']}"
+        if entry.appt_date:
+            # Draw date and time in larger font on same line
+            datetime_font = get_font(layout.appt_datetime_pt)
+            datetime_str = entry.appt_datetime
             w, h = self._calculate_text_size(datetime_str, datetime_font)
-            pos = ((self.width - w) / 2, line_y + 20)  # Moved up from +30
-            self._img_draw.text(pos, datetime_str, font=datetime_font, fill=BLACK)
+            pos = ((self.width - w) / 2, layout.appt_datetime_y)
+            datetime_font.draw(self._img_draw, pos, datetime_str, BLACK)
             
             # Draw appointment type with text wrapping if needed
-            type_font = create_font(16)  # Slightly smaller for better fit
-            type_text = next_appointment['type'].upper()
+            type_font = get_font(layout.appt_type_pt)
+            type_text = entry.appt_type.upper()
             
             # Check if text needs wrapping
-            max_width = self.width - 30  # Reduced margins for more text space
+            max_width = layout.appt_type_max_width
             w, h = self._calculate_text_size(type_text, type_font)
             
-            type_y = line_y + 50  # Moved up from +65 for more room
+            type_y = layout.appt_type_y
             
             if w > max_width:
                 # Text too long, wrap it
-                words = type_text.split()
-                lines = []
-                current_line = ""
-                
-                for word in words:
-                    test_line = current_line + " " + word if current_line else word
-                    test_w, _ = self._calculate_text_size(test_line, type_font)
-                    if test_w <= max_width:
-                        current_line = test_line
-                    else:
-                        if current_line:
-                            lines.append(current_line)
-                        current_line = word
-                if current_line:
-                    lines.append(current_line)
+                lines = self._wrap_text(type_text, type_font, max_width)
                 
                 # Draw each line centered
-                for i, line in enumerate(lines[:3]):  # Increased to max 3 lines
+                for i, line in enumerate(lines[:layout.appt_type_max_lines]):
                     line_w, line_h = self._calculate_text_size(line, type_font)
-                    pos = ((self.width - line_w) / 2, type_y + i * 22)
-                    self._img_draw.text(pos, line, font=type_font, fill=BLACK)
+                    pos = ((self.width - line_w) / 2, type_y + i * layout.appt_type_spacing)
+                    type_font.draw(self._img_draw, pos, line, BLACK)
             else:
                 # Text fits, draw normally
                 pos = ((self.width - w) / 2, type_y)
-                self._img_draw.text(pos, type_text, font=type_font, fill=BLACK)
+                type_font.draw(self._img_draw, pos, type_text, BLACK)
         else:
             # No appointments message
-            no_appt_font = create_font(18)
+            no_appt_font = get_font(layout.no_appt_pt)
             no_appt_text = "No upcoming appointments"
             w, h = self._calculate_text_size(no_appt_text, no_appt_font)
             pos = ((self.width - w) / 2, (self.height - h) / 2)
-            self._img_draw.text(pos, no_appt_text, font=no_appt_font, fill=BLACK)
+            no_appt_font.draw(self._img_draw, pos, no_appt_text, BLACK)
     
     def _get_next_appointment(self):
         """Get the next upcoming appointment"""
-        if not self.appointments:
-            return None
-        
-        today = datetime.now().date()
-        future_appointments = []
-        
-        for appt in self.appointments:
-            try:
-                appt_date = datetime.strptime(appt['date'], '%Y-%m-%d').date()
-                if appt_date >= today:
-                    future_appointments.append(appt)
-            except:
-                continue
-        
-        # Sort by date and return the first one
-        if future_appointments:
-            future_appointments.sort(key=lambda x: x['date'])
-            return future_appointments[0]
-        
-        return None
+        return self._day().appointment
     
     def _draw_milestones_page(self):
         """Draw developmental milestones page"""
-        title_font = create_font(20)
-        _, title_h = self._calculate_text_size("New Foley Progress", title_font)
-        
+        layout = self.layout
         # Line is already drawn in main draw() method
-        line_y = self.TITLE_MARGIN_TOP + title_h + 6
         
         # Get milestone info for current week
-        week = self.pregnancy.get_pregnancy_week()
-        milestone = get_milestone_for_week(week)
+        entry = self._day()
         
         # Draw weight
-        weight_label_font = create_font(13)
+        weight_label_font = get_font(layout.weight_label_pt)
         weight_label = "WEIGHT"
         w, h = self._calculate_text_size(weight_label, weight_label_font)
-        pos = ((self.width - w) / 2, line_y + 20)
-        self._img_draw.text(pos, weight_label, font=weight_label_font, fill=DARK_GRAY)
+        pos = ((self.width - w) / 2, layout.weight_label_y)
+        weight_label_font.draw(self._img_draw, pos, weight_label, DARK_GRAY)
         
-        weight_font = create_font(16)
-        weight_text = milestone['weight']
+        weight_font = get_font(layout.weight_pt)
+        weight_text = entry.weight
         w, h = self._calculate_text_size(weight_text, weight_font)
-        pos = ((self.width - w) / 2, line_y + 38)
-        self._img_draw.text(pos, weight_text, font=weight_font, fill=BLACK)
+        pos = ((self.width - w) / 2, layout.weight_y)
+        weight_font.draw(self._img_draw, pos, weight_text, BLACK)
         
         # Draw development info with text wrapping
-        dev_label_font = create_font(13)
+        dev_label_font = get_font(layout.dev_label_pt)
         dev_label = "DEVELOPMENT"
         w, h = self._calculate_text_size(dev_label, dev_label_font)
-        pos = ((self.width - w) / 2, line_y + 70)
-        self._img_draw.text(pos, dev_label, font=dev_label_font, fill=DARK_GRAY)
+        pos = ((self.width - w) / 2, layout.dev_label_y)
+        dev_label_font.draw(self._img_draw, pos, dev_label, DARK_GRAY)
         
         # Wrap development text if needed - smaller font for better fit
-        dev_font = create_font(13)
-        dev_text = milestone["development"]
-        max_width = self.width - 16  # 8px margin on each side
+        dev_font = get_font(layout.dev_pt)
+        lines = self._wrap_text(entry.development, dev_font, layout.dev_max_width)
         
-        # Split text into lines that fit
-        words = dev_text.split()
-        lines = []
-        current_line = ""
-        
-        for word in words:
-            test_line = current_line + " " + word if current_line else word
-            test_w, _ = self._calculate_text_size(test_line, dev_font)
-            if test_w <= max_width:
-                current_line = test_line
-            else:
-                if current_line:
-                    lines.append(current_line)
-                current_line = word
-        if current_line:
-            lines.append(current_line)
-        
-        # Draw development text lines (max 4 lines to fit screen)
-        dev_y = line_y + 88
-        line_spacing = 16  # Reduced spacing between lines
-        for i, line in enumerate(lines[:4]):  # Increased to 4 lines
+        # Draw development text lines (limited to what fits the screen)
+        for i, line in enumerate(lines[:layout.dev_max_lines]):
             line_w, line_h = self._calculate_text_size(line, dev_font)
-            pos = ((self.width - line_w) / 2, dev_y + i * line_spacing)
-            self._img_draw.text(pos, line, font=dev_font, fill=BLACK)
+            pos = ((self.width - line_w) / 2, layout.dev_y + i * layout.dev_spacing)
+            dev_font.draw(self._img_draw, pos, line, BLACK)
 
     def _draw_page_indicators(self, current_page):
         """Draw page indicator dots at the bottom - DISABLED"""
         # Page indicators removed since we're using buttons now
         pass
 
+    def _page_key(self):
+        """Everything that changes the pixels of the current page"""
+        page = self.current_page
+        if page == 0:
+            content = (self.pregnancy.get_percent_str(), self._day().weekday_str,
+                       int(self._get_progress_bar_mid_x_point()))
+        elif page == 2:
+            entry = self._day()
+            content = (entry.appt_datetime, entry.appt_type)
+        else:
+            content = self._day().week
+        return (self.width, self.height, page, content)
+
     def draw(self):
+        """Render the current page into the shared frame buffer and return it.
+
+        The returned image is reused by the next draw(), copy it to keep it.
+        """
+        key = self._page_key()
+        cached = _page_cache.get(key)
+        if cached is not None:
+            self._img.paste(cached)
+            return self._img
+
         # Clear the image to ensure no overlap
-        self._img = Image.new('L', (self.width, self.height), 255)
-        self._img_draw = ImageDraw.Draw(self._img)
+        self._img_draw.rectangle((0, 0, self.width, self.height), fill=WHITE)
         
         # Draw title and decorative line for pages except appointments
         if self.current_page != 2:
             self._draw_title()
             
             # Draw decorative line under title
-            title_font = create_font(20)
-            _, title_h = self._calculate_text_size("New Foley Progress", title_font)
-            line_y = self.TITLE_MARGIN_TOP + title_h + 6
-            self._img_draw.line([(20, line_y), (self.width - 20, line_y)], fill=BLACK, width=2)
+            self._draw_title_line(self.layout.line_y)
         
         if self.current_page == 0:
             # Progress screen
@@ -411,32 +388,29 @@ class ScreenUI:
             self._draw_milestones_page()
         
         self._draw_page_indicators(self.current_page)
+        if _page_cache.max_bytes >= image_size(self._img):
+            _page_cache.put(key, self._img.copy())
         return self._img
 
     def _draw_progress_done(self):
-        y1 = int(self.PROGRESS_BAR_Y_CENTER - self.PROGRESS_BAR_HEIGHT/2)
-        y2 = y1 + self.PROGRESS_BAR_HEIGHT
-        x1 = self.ICON_X_MARGIN + self.ICON_CIRCLE_SIZE
+        layout = self.layout
         x2 = self._get_progress_bar_mid_x_point()
-        self._img_draw.rectangle((x1, y1, x2, y2), fill=LIGHT_GRAY)
+        self._img_draw.rectangle((layout.bar_x1, layout.bar_y1, x2, layout.bar_y2), fill=LIGHT_GRAY)
 
     def _draw_progress_remaining(self):
-        y1 = int(self.PROGRESS_BAR_Y_CENTER - self.PROGRESS_BAR_HEIGHT/2)
-        y2 = y1 + self.PROGRESS_BAR_HEIGHT
+        layout = self.layout
         x1 = self._get_progress_bar_mid_x_point()
-        x2 = self.width - self.ICON_X_MARGIN - self.ICON_CIRCLE_SIZE
-        self._img_draw.rectangle((x1, y1, x2, y2), fill=DARK_GRAY)
+        self._img_draw.rectangle((x1, layout.bar_y1, layout.bar_x2, layout.bar_y2), fill=DARK_GRAY)
 
     def _draw_progress_circle(self):
         mid_x = self._get_progress_bar_mid_x_point()
-        mid_y = self.PROGRESS_BAR_Y_CENTER
-        size = self.PROGRESS_BAR_HEIGHT
+        mid_y = self.layout.bar_y_center
+        size = self.layout.bar_knob_size
         pos = (mid_x-size/2, mid_y-size/2, mid_x+size/2, mid_y+size/2)
         self._img_draw.ellipse(pos, fill=LIGHT_GRAY)
 
     def _get_progress_bar_length(self):
-        return self.width - 2*self.ICON_X_MARGIN - 2*self.ICON_CIRCLE_SIZE
+        return self.layout.bar_x2 - self.layout.bar_x1
 
     def _get_progress_bar_mid_x_point(self):
-        offset = self.ICON_X_MARGIN + self.ICON_CIRCLE_SIZE
-        return offset + self._get_progress_bar_length()*self.pregnancy.get_progress()
\ No newline at end of file
+        return self.layout.bar_x1 + self._get_progress_bar_length()*self.pregnancy.get_progress()
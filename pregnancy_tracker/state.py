@@ -0,0 +1,138 @@
+"""Small crash-safe store for what should survive a restart.
+
+Holds the current page, the digest of the frame last sent to the panel
+and a manifest of the cache files on disk. Changes are kept in memory
+and written together at most every flush_interval seconds (and on
+shutdown) to spare the SD card. Each write goes to a temp file, which
+is fsynced and renamed over the old one, so a power cut leaves either
+the old state or the new one, never a torn file.
+
+A clean shutdown is recorded too. The e-paper keeps its image without
+power, so after a clean exit the tracker can trust that the panel still
+shows the saved frame and skip both the clear and the refresh. After a
+crash it refreshes once, since it can't know whether a refresh was cut
+off half way.
+"""
+import json
+import logging
+import os
+import time
+
+from .logs import event
+
+STATE_VERSION = 1
+
+
+class StateStore:
+    def __init__(self, path, flush_interval=600, clock=time.monotonic):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self.writes = 0
+        self.coalesced = 0
+        self.dirty = False
+        self._last_write = None
+        self._data = self._read()
+        self.resumed_clean = self._data.pop('clean_shutdown', False)
+        # Clear the flag on disk at the first flush, so a crash from here on is noticed
+        self.dirty = self.resumed_clean
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if data.get('version') == STATE_VERSION:
+                return data
+            event('state_ignored', level=logging.WARNING, path=self.path, version=data.get('version'))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as e:
+            event('state_unreadable', level=logging.WARNING, path=self.path, error=str(e))
+        return {'version': STATE_VERSION}
+
+    def get(self, key, default=None):
+        return self._data.get(key, default)
+
+    def update(self, **values):
+        """Change values in memory; returns True if anything changed"""
+        changed = {key: value for key, value in values.items() if self._data.get(key) != value}
+        if not changed:
+            return False
+        if self.dirty:
+            self.coalesced += 1
+        self._data.update(changed)
+        self.dirty = True
+        return True
+
+    def next_flush_in(self):
+        """Seconds until a pending change is due to be written, or None"""
+        if not self.dirty:
+            return None
+        if self._last_write is None:
+            return 0.0
+        return max(0.0, self._last_write + self.flush_interval - self.clock())
+
+    def maybe_flush(self):
+        """Write pending changes if the batching interval has passed"""
+        due = self.next_flush_in()
+        if due is not None and due <= 0:
+            self.flush()
+
+    def flush(self, clean_shutdown=False):
+        """Write the state now, atomically"""
+        if not self.dirty and not clean_shutdown:
+            return
+        data = dict(self._data, clean_shutdown=clean_shutdown)
+        directory = os.path.dirname(self.path) or '.'
+        tmp_path = self.path + '.tmp'
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f, sort_keys=True)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            # Make the rename itself durable
+            dir_fd = os.open(directory, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        except OSError as e:
+            event('state_write_failed', level=logging.ERROR, path=self.path, error=str(e))
+            return
+        self.dirty = False
+        self._last_write = self.clock()
+        self.writes += 1
+
+    # Cache manifest: which files on disk hold which cache contents
+
+    def record_cache(self, name, path, key):
+        """Note that path now holds the cache built for key"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        caches = dict(self._data.get('caches', {}))
+        caches[name] = {'path': path, 'key': key, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+        self.update(caches=caches)
+
+    def cache_valid(self, name, key):
+        """True if the cache file for name is unchanged since it was recorded for key"""
+        entry = self._data.get('caches', {}).get(name)
+        if not entry or entry['key'] != key:
+            return False
+        try:
+            st = os.stat(entry['path'])
+        except OSError:
+            return False
+        return (st.st_size, st.st_mtime_ns) == (entry['size'], entry['mtime_ns'])
+
+    def check_caches(self):
+        """Drop manifest entries whose files changed or vanished; returns their names"""
+        stale = [name for name, entry in self._data.get('caches', {}).items()
+                 if not self.cache_valid(name, entry['key'])]
+        if stale:
+            caches = {name: entry for name, entry in self._data['caches'].items() if name not in stale}
+            self.update(caches=caches)
+        return stale
@@ -1,15 +1,26 @@
 #!/usr/bin/env python3
-"""Generate preview images for all 4 pages of the pregnancy tracker"""
+"""Generate preview images for all 4 pages of the pregnancy tracker
 
-import json
-from PIL import Image
-from pregnancy_tracker import ScreenUI, Pregnancy
+Usage: python3 preview_all_pages.py [--size WIDTHxHEIGHT]
+"""
+
+import argparse
+from pregnancy_tracker import ScreenUI
+from pregnancy_tracker.config import load_config
+from pregnancy_tracker.logs import setup_logging
+
+parser = argparse.ArgumentParser(description="Generate preview images for all 4 pages")
+parser.add_argument('--size', default='264x176', help='panel size in landscape, e.g. 400x300')
+args = parser.parse_args()
+width, height = (int(v) for v in args.size.lower().split('x'))
 
 # Load config
-config = json.load(open('config.json'))
+setup_logging('WARNING')
+config = load_config('config.json', fallback=False)
 
 # Create pregnancy object
-pregnancy = Pregnancy(config['expected_birth_date'])
+profile = config.profiles[0]
+pregnancy = profile.create_pregnancy()
 
 print(f"Generating all pages for week {pregnancy.get_pregnancy_week()}...")
 print(f"Days until due: {pregnancy.get_days_until_due_date()}")
@@ -25,7 +36,8 @@ pages = [
 ]
 
 for page_num, page_name, filename in pages:
-    screen_ui = ScreenUI(264, 176, pregnancy, current_page=page_num)
+    screen_ui = ScreenUI(width, height, pregnancy, current_page=page_num,
+                         appointments_path=profile.appointments_path)
     img = screen_ui.draw()
     img.save(filename)
     print(f"✓ Page {page_num}: {page_name} -> {filename}")
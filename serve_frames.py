@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Serve rendered tracker frames to network e-paper boards
+
+Usage: python3 serve_frames.py [--host 0.0.0.0] [--port 8642] [--max-age 600]
+"""
+
+import argparse
+import os
+
+from pregnancy_tracker.cache import configure_caches
+from pregnancy_tracker.config import load_config
+from pregnancy_tracker.fonts import use_text_renderer
+from pregnancy_tracker.frame_server import FrameServer, FrameSource
+from pregnancy_tracker.logs import setup_logging
+from pregnancy_tracker.panel import panel_size
+from pregnancy_tracker.profiles import DEFAULT_MODEL
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on')
+    parser.add_argument('--port', type=int, default=8642)
+    parser.add_argument('--max-age', type=int, default=600, help='seconds before a cached frame is re-rendered')
+    parser.add_argument('--model', default=DEFAULT_MODEL, help='panel model the clients drive')
+    args = parser.parse_args()
+
+    config_file_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'config.json')
+    config = load_config(config_file_path)
+    setup_logging(config.log_level or 'WARNING')
+    configure_caches(config.low_memory, config.cache_budgets)
+    use_text_renderer(config.text_renderer, config.glyph_atlas)
+
+    profiles = config.profiles
+    width, height = panel_size(args.model)
+    server = FrameServer(FrameSource(profiles, width, height, args.max_age), args.host, args.port)
+    print(f"Serving {len(profiles)} profile(s) at {server.url}/frames/<profile>/<page>")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
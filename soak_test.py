@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""Soak test: button storms over a whole pregnancy in simulated time
+
+Drives the real ButtonInput, PowerManager and ScreenUI the way main.py
+does, but with a fake GPIO module, a simulated panel and a virtual clock,
+so months of uptime and millions of presses run in minutes. Presses come
+in storms (bouncing contacts, a child mashing keys) separated by quiet
+gaps; presses that land while the panel is refreshing queue up exactly
+as they would on the device. Reports render and press-to-screen latency,
+queue depth, dropped and debounced presses, and memory and file
+descriptor growth.
+
+Usage: python3 soak_test.py [--events N] [--days N] [--seed N] [--stub-render] [--low-memory]
+"""
+
+import argparse
+import gc
+import os
+import random
+import resource
+import time
+from array import array
+from collections import deque
+from datetime import timedelta
+
+from pregnancy_tracker import Pregnancy, ScreenUI
+from pregnancy_tracker.buttons import ButtonInput, DEFAULT_PINS
+from pregnancy_tracker.cache import configure_caches, cache_stats
+from pregnancy_tracker.config import load_config
+from pregnancy_tracker.day_index import DayIndex
+from pregnancy_tracker.display import SimClock, SimulatedEPD
+from pregnancy_tracker.fonts import TEXT_RENDERERS, use_text_renderer
+from pregnancy_tracker.logs import setup_logging
+from pregnancy_tracker.power import PowerManager
+
+# A press that waits longer than this to reach the screen counts as a stall
+STALL_SECONDS = 60
+
+
+class FakeGPIO:
+    """Just enough of RPi.GPIO for ButtonInput; press() fires the edge callback"""
+
+    BCM = 'BCM'
+    IN = 'IN'
+    PUD_UP = 'PUD_UP'
+    FALLING = 'FALLING'
+
+    def __init__(self):
+        self.callbacks = {}
+        self.edge_time = 0.0
+
+    def setmode(self, mode):
+        pass
+
+    def setwarnings(self, flag):
+        pass
+
+    def setup(self, pin, direction, pull_up_down=None):
+        pass
+
+    def add_event_detect(self, pin, edge, callback, bouncetime=None):
+        self.callbacks[pin] = callback
+
+    def remove_event_detect(self, pin):
+        self.callbacks.pop(pin, None)
+
+    def cleanup(self, pins=None):
+        self.callbacks.clear()
+
+    def press(self, pin, at):
+        self.edge_time = at
+        self.callbacks[pin](pin)
+
+
+class StubScreen:
+    """Stands in for ScreenUI with one pre-drawn frame per page, to time the input path alone"""
+
+    def __init__(self, screen_ui):
+        self.pregnancy = screen_ui.pregnancy
+        self.current_page = 0
+        self.frames = []
+        for page in range(4):
+            screen_ui.set_page(page)
+            self.frames.append(screen_ui.draw().copy())
+
+    def set_page(self, page_num):
+        if 0 <= page_num <= 3:
+            self.current_page = page_num
+
+    def draw(self):
+        return self.frames[self.current_page]
+
+
+def storms(rng, pins, mean_gap):
+    """Endless (time, pin) presses: bursts of quick presses between quiet gaps"""
+    now = 0.0
+    while True:
+        now += rng.expovariate(1 / mean_gap)
+        burst = 1 + int(rng.expovariate(1 / 4))
+        pin = rng.choice(pins)
+        for _ in range(burst):
+            yield now, pin
+            # Contact bounce is a few ms apart, deliberate mashing a few hundred
+            now += rng.choice((rng.uniform(0.002, 0.02), rng.uniform(0.1, 0.6)))
+            if rng.random() < 0.3:
+                pin = rng.choice(pins)
+
+
+def rss_kb():
+    """Current resident set size in kB (peak RSS where /proc is missing)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def open_fds():
+    try:
+        return len(os.listdir('/proc/self/fd'))
+    except OSError:
+        return None
+
+
+def percentiles(values, points=(50, 90, 99, 100)):
+    if not values:
+        return {p: 0.0 for p in points}
+    ordered = sorted(values)
+    return {p: ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] for p in points}
+
+
+class Soak:
+    def __init__(self, pregnancy_start, due_date, appointments, events, days, seed, sample_every,
+                 stub_render=False):
+        self.clock = SimClock()
+        start = pregnancy_start
+        self.pregnancy = Pregnancy(due_date, clock=lambda: start + timedelta(seconds=self.clock.now))
+        self.epd = SimulatedEPD(clock=self.clock, max_frames=1)
+        self.screen_ui = ScreenUI(self.epd.height, self.epd.width, self.pregnancy, appointments=appointments)
+        self.screen_ui.day_index = DayIndex.build(self.pregnancy, appointments)
+        if stub_render:
+            self.screen_ui = StubScreen(self.screen_ui)
+        self.power = PowerManager(self.epd, self.screen_ui, timer=self.clock.time)
+        self.gpio = FakeGPIO()
+        self.buttons = ButtonInput(self.gpio, DEFAULT_PINS, clock=lambda: self.gpio.edge_time)
+
+        self.end = days * 86400
+        self.max_events = events
+        self.presses = storms(random.Random(seed), list(DEFAULT_PINS.values()), self.end / events * 5)
+        self.next_press = next(self.presses)
+        self.sample_every = sample_every
+
+        self.delivered = 0
+        self.waiting = deque()  # press times of queued presses, oldest first
+        # Compact arrays, so the harness's own bookkeeping barely shows in RSS
+        self.render_times = array('d')
+        self.press_latencies = array('d')
+        self.queue_depths = array('I')
+        self.stalls = 0
+        self.samples = []
+
+    def _deliver(self, until):
+        """Fire every press up to virtual time until; returns True if one was queued"""
+        queued = False
+        while self.delivered < self.max_events and self.next_press[0] <= until:
+            at, pin = self.next_press
+            before = self.buttons.dropped + self.buttons.debounced
+            self.gpio.press(pin, at)
+            if self.buttons.dropped + self.buttons.debounced == before:
+                self.waiting.append(at)
+                queued = True
+            self.delivered += 1
+            self.next_press = next(self.presses)
+            if self.delivered % self.sample_every == 0:
+                self._sample()
+        return queued
+
+    def _sample(self):
+        gc.collect()
+        self.samples.append((self.delivered, self.clock.now / 86400, rss_kb() - self._harness_kb(),
+                             open_fds(), len(gc.get_objects())))
+
+    def _harness_kb(self):
+        recorded = (self.render_times, self.press_latencies, self.queue_depths)
+        return sum(len(a) * a.itemsize for a in recorded) // 1024
+
+    def run(self):
+        """main.py's wait_and_refresh() loop, with waiting done in virtual time"""
+        self._sample()
+        while self.clock.now < self.end and self.delivered < self.max_events:
+            deadline = min(self.end, self.clock.now + self.power.idle_window())
+            # Block like button_handler.get(timeout): wake on the first queued press
+            while self.clock.now < deadline and not self.buttons.events.qsize():
+                step = min(deadline, self.next_press[0]) if self.delivered < self.max_events else deadline
+                self.clock.now = max(self.clock.now, step)
+                self._deliver(self.clock.now)
+
+            self.queue_depths.append(self.buttons.events.qsize())
+            pages = self.buttons.drain()
+            for page in pages:
+                self.power.request(page)
+
+            renders = self.power.counters['renders']
+            start = time.perf_counter()
+            self.power.flush()
+            if self.power.counters['renders'] != renders:
+                self.render_times.append(time.perf_counter() - start)
+
+            # The screen now shows what was asked for before the refresh began
+            for _ in pages:
+                latency = self.clock.now - self.waiting.popleft()
+                self.press_latencies.append(latency)
+                if latency > STALL_SECONDS:
+                    self.stalls += 1
+            # Presses that arrived while the panel was busy are queued now
+            self._deliver(self.clock.now)
+        self._sample()
+
+    def report(self, elapsed):
+        buttons, counters = self.buttons, self.power.counters
+        print(f"Simulated {self.clock.now / 86400:.1f} days, {self.delivered} presses "
+              f"in {elapsed:.1f}s ({self.delivered / max(elapsed, 1e-9):,.0f} presses/s)")
+        print(f"  queued {len(self.press_latencies) + len(self.waiting)}, debounced {buttons.debounced}, "
+              f"dropped {buttons.dropped} (queue full at {buttons.events.maxsize})")
+        print(f"  renders {counters['renders']}, refreshes {counters['refreshes']}, "
+              f"skipped {counters['skipped']}, wakes {counters['wakes']}")
+
+        render = percentiles(self.render_times)
+        print("  render latency (real)      " +
+              "  ".join(f"p{p} {v * 1000:7.2f} ms" for p, v in render.items()))
+        press = percentiles(self.press_latencies)
+        print("  press to screen (virtual)  " +
+              "  ".join(f"p{p} {v:7.2f} s " for p, v in press.items()))
+        depth = percentiles(self.queue_depths)
+        print("  queue depth at wake        " +
+              "  ".join(f"p{p} {v:7d}   " for p, v in depth.items()))
+        print(f"  stalls over {STALL_SECONDS}s: {self.stalls}, presses never shown: {len(self.waiting)}")
+
+        print("")
+        print("RSS excludes the harness's own latency records")
+        print(f"{'presses':>10} {'day':>6} {'RSS kB':>8} {'fds':>4} {'objects':>8}")
+        step = max(1, len(self.samples) // 10)
+        for delivered, day, rss, fds, objects in self.samples[::step] + self.samples[-1:]:
+            print(f"{delivered:10d} {day:6.1f} {rss:8d} {fds if fds is not None else '-':>4} {objects:8d}")
+        # Compare against the first sample after warm-up, once every page is cached
+        base = self.samples[min(1, len(self.samples) - 1)]
+        last = self.samples[-1]
+        fd_growth = (last[3] - base[3]) if None not in (base[3], last[3]) else 0
+        print(f"Growth since warm-up: RSS {last[2] - base[2]:+d} kB, fds {fd_growth:+d}, "
+              f"objects {last[4] - base[4]:+d}")
+        for name, stats in sorted(cache_stats().items()):
+            print(f"  cache {name:<8} {stats['entries']:4d} entries {stats['bytes'] / 1024:8.1f} / "
+                  f"{stats['max_bytes'] / 1024:.0f} kB")
+        return fd_growth == 0 and not self.waiting and not self.stalls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--events', type=int, default=1_000_000, help='button presses to send')
+    parser.add_argument('--days', type=float, default=294, help='simulated days, from conception')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--samples', type=int, default=50, help='memory and fd samples to take')
+    parser.add_argument('--stub-render', action='store_true',
+                        help='show pre-drawn frames instead of rendering, to test input handling alone')
+    parser.add_argument('--low-memory', action='store_true', help='use the low-memory cache budgets')
+    parser.add_argument('--text-renderer', choices=TEXT_RENDERERS, help='override config.json')
+    args = parser.parse_args()
+
+    setup_logging('WARNING')
+    config = load_config('config.json', fallback=False)
+    configure_caches(args.low_memory or config.low_memory, config.raw.get('cache_budgets'))
+    use_text_renderer(args.text_renderer or config.text_renderer, config.glyph_atlas)
+    profile = config.profiles[0]
+    pregnancy = profile.create_pregnancy()
+    appointments = ScreenUI(264, 176, pregnancy, appointments_path=profile.appointments_path).appointments
+
+    soak = Soak(pregnancy.pregnancy_start_date, profile.expected_birth_date, appointments,
+                args.events, args.days, args.seed, max(1, args.events // args.samples),
+                args.stub_render)
+    start = time.perf_counter()
+    soak.run()
+    return 0 if soak.report(time.perf_counter() - start) else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,160 @@
+"""Check every page against the golden images in res/golden
+
+Renders each page for a matrix of frozen dates, appointment sets and
+panel sizes, and compares it with the checked-in golden image. A page
+fails when any 8x8 block differs by more than the block tolerance, which
+ignores single-pixel anti-aliasing noise but catches moved or clipped
+text. Failures write expected | actual | diff images to golden_diffs/.
+
+pytest runs every case (tests/test_golden.py). Run this module directly
+to check them in parallel or to re-render the goldens:
+
+Usage: python3 -m tests.golden [--update] [--jobs N] [--only PATTERN]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from PIL import Image
+
+from pregnancy_tracker import ScreenUI, Pregnancy
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+GOLDEN_DIR = os.path.join(REPO_DIR, 'res', 'golden')
+DIFF_DIR = os.path.join(REPO_DIR, 'golden_diffs')
+
+DUE_DATE = '2025-05-15'
+
+# Frozen "today" values: the first visit, mid, late and post-term. Each
+# shows a different week, size, milestone and next "short" appointment.
+DATES = ['2024-08-30', '2024-12-20', '2025-03-10', '2025-05-20']
+
+SIZES = [(264, 176), (296, 128), (400, 300)]
+
+APPOINTMENT_SETS = {
+    'none': [],
+    'short': [
+        {"date": "2024-08-30", "time": "9:00 AM", "type": "First Visit"},
+        {"date": "2025-01-15", "time": "11:00 AM", "type": "Glucose Test"},
+        {"date": "2025-04-01", "time": "10:15 AM", "type": "Checkup"},
+    ],
+    'long': [
+        {"date": "2025-06-02", "time": "2:30 PM",
+         "type": "Anatomy ultrasound and consultation with the maternal fetal medicine specialist"},
+    ],
+}
+
+BLOCK = 8
+PIXEL_TOLERANCE = 48      # grey levels a pixel may move before it counts as changed
+BLOCK_TOLERANCE = 0.12    # share of changed pixels allowed in any block
+
+
+def cases():
+    """(size, date, appointment set, page); appointments only matter on page 2"""
+    for size in SIZES:
+        for date in DATES:
+            for page in range(4):
+                appt_sets = APPOINTMENT_SETS if page == 2 else ['short']
+                for appt_set in appt_sets:
+                    yield size, date, appt_set, page
+
+
+def case_name(size, date, appt_set, page):
+    return f"{size[0]}x{size[1]}/{date}-{appt_set}-page{page}"
+
+
+def render(size, date, appt_set, page):
+    frozen = datetime.strptime(date, '%Y-%m-%d')
+    pregnancy = Pregnancy(DUE_DATE, clock=lambda: frozen)
+    screen_ui = ScreenUI(size[0], size[1], pregnancy, current_page=page,
+                         appointments=APPOINTMENT_SETS[appt_set])
+    return screen_ui.draw().copy()
+
+
+def compare(expected, actual):
+    """Return (passed, worst block score, changed-pixel mask)"""
+    # Imported here so build_glyph_atlas.py can render the cases on a board without NumPy
+    import numpy as np
+
+    if expected.size != actual.size:
+        return False, 1.0, None
+    a = np.asarray(expected, dtype=np.int16)
+    b = np.asarray(actual, dtype=np.int16)
+    changed = np.abs(a - b) > PIXEL_TOLERANCE
+
+    # Share of changed pixels in each BLOCK x BLOCK region
+    h, w = changed.shape
+    ph, pw = -h % BLOCK, -w % BLOCK
+    padded = np.pad(changed, ((0, ph), (0, pw)))
+    blocks = padded.reshape((h + ph) // BLOCK, BLOCK, (w + pw) // BLOCK, BLOCK).mean(axis=(1, 3))
+    worst = float(blocks.max()) if blocks.size else 0.0
+    return worst <= BLOCK_TOLERANCE, worst, changed
+
+
+def write_diff(name, expected, actual, changed):
+    """Save expected | actual | diff, with changed pixels in red"""
+    import numpy as np
+
+    width, height = actual.size
+    sheet = Image.new('RGB', (width * 3, height), (255, 255, 255))
+    sheet.paste(expected.convert('RGB').resize(actual.size), (0, 0))
+    sheet.paste(actual.convert('RGB'), (width, 0))
+    faded = (np.asarray(actual.convert('RGB'), dtype=np.uint16) // 4 + 191).astype(np.uint8)
+    if changed is not None:
+        faded[changed] = (255, 0, 0)
+    sheet.paste(Image.fromarray(faded), (width * 2, 0))
+    os.makedirs(DIFF_DIR, exist_ok=True)
+    path = os.path.join(DIFF_DIR, name.replace('/', '_') + '.png')
+    sheet.save(path)
+    return path
+
+
+def check_case(case, update):
+    name = case_name(*case)
+    golden_path = os.path.join(GOLDEN_DIR, name + '.png')
+    actual = render(*case)
+    if update:
+        os.makedirs(os.path.dirname(golden_path), exist_ok=True)
+        actual.save(golden_path, optimize=True)
+        return name, True, 0.0, None
+    if not os.path.exists(golden_path):
+        return name, False, 1.0, 'missing golden image'
+    expected = Image.open(golden_path).convert('L')
+    passed, worst, changed = compare(expected, actual)
+    diff_path = None if passed else write_diff(name, expected, actual, changed)
+    return name, passed, worst, diff_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--update', action='store_true', help='re-render the golden images')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='worker processes')
+    parser.add_argument('--only', default='', help='only run cases whose name contains this')
+    args = parser.parse_args()
+
+    selected = [case for case in cases() if args.only in case_name(*case)]
+    os.makedirs(DIFF_DIR, exist_ok=True)
+    for old in os.listdir(DIFF_DIR):
+        os.remove(os.path.join(DIFF_DIR, old))
+
+    start = time.perf_counter()
+    failures = 0
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        results = pool.map(check_case, selected, [args.update] * len(selected), chunksize=4)
+        for name, passed, worst, detail in results:
+            if not passed:
+                failures += 1
+                print(f"FAIL {name} (worst block {worst:.0%}): {detail}")
+    elapsed = time.perf_counter() - start
+
+    action = 'Updated' if args.update else 'Checked'
+    print(f"{action} {len(selected)} pages in {elapsed:.2f}s, {failures} failed")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
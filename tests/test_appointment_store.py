@@ -0,0 +1,61 @@
+from datetime import date
+
+import pytest
+
+from pregnancy_tracker.appointment_store import AppointmentStore, load_appointments, store_source
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = str(tmp_path / 'practice.db')
+    with AppointmentStore(path) as store:
+        yield store
+
+
+def appt(day, kind, time='9:00 AM', **extra):
+    return dict(date=f'2025-01-{day:02d}', time=time, type=kind, **extra)
+
+
+def test_profile_argument_only_fills_in_missing_profiles(store):
+    stored, skipped = store.upsert([appt(1, 'Scan', profile='twin-a'), appt(2, 'Checkup')], profile='twin-b')
+    assert (stored, skipped) == (2, [])
+    assert [a['type'] for a in store.appointments('twin-a')] == ['Scan']
+    assert [a['type'] for a in store.appointments('twin-b')] == ['Checkup']
+
+
+def test_importing_again_updates_in_place(store):
+    store.upsert([appt(1, 'Scan')], profile='a')
+    store.upsert([appt(1, 'Anatomy scan')], profile='a')
+    assert store.appointments('a') == [{'date': '2025-01-01', 'time': '9:00 AM', 'type': 'Anatomy scan'}]
+
+
+def test_replace_drops_only_the_imported_profiles(store):
+    store.upsert([appt(1, 'Old', profile='a'), appt(2, 'Kept', profile='b')])
+    store.upsert([appt(3, 'New', profile='a')], replace=True)
+    assert [x['type'] for x in store.appointments('a')] == ['New']
+    assert [x['type'] for x in store.appointments('b')] == ['Kept']
+
+
+def test_invalid_rows_are_skipped(store):
+    bad = [
+        appt(1, 'No profile'),
+        {'profile': 'a', 'date': '2025-1-5', 'time': '9:00 AM', 'type': 'Short date'},
+        {'profile': 'a', 'date': '2025-02-30', 'time': '9:00 AM', 'type': 'No such day'},
+        {'profile': 'a', 'date': '2025-01-05', 'type': 'No time'},
+        {'profile': 'a', 'date': '2025-01-05', 'time': '9:00 AM', 'type': None},
+    ]
+    stored, skipped = store.upsert(bad + [appt(6, 'Good', profile='a')])
+    assert stored == 1
+    assert skipped == bad
+    assert store.profiles() == ['a']
+
+
+def test_next_appointments_in_time_order(store):
+    store.upsert([appt(5, 'Late', '2:30 PM'), appt(5, 'Early', '8:15 AM'), appt(1, 'Past')], profile='a')
+    upcoming = store.next_appointments('a', date(2025, 1, 5), limit=2)
+    assert [x['type'] for x in upcoming] == ['Early', 'Late']
+
+
+def test_load_appointments_reads_a_profile_with_hash_in_its_name(store):
+    store.upsert([appt(1, 'Scan')], profile='Twin #1')
+    assert load_appointments(store_source(store.path, 'Twin #1'))[0]['type'] == 'Scan'
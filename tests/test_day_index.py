@@ -0,0 +1,56 @@
+import os
+
+import pytest
+
+from pregnancy_tracker import Pregnancy
+from pregnancy_tracker.day_index import HEADER, DayIndex
+
+APPOINTMENTS = [{"date": "2025-01-15", "time": "11:00 AM", "type": "Glucose Test"}]
+
+
+@pytest.fixture
+def saved(tmp_path):
+    pregnancy = Pregnancy('2025-05-15')
+    index = DayIndex.build(pregnancy, APPOINTMENTS)
+    path = str(tmp_path / 'day_index.bin')
+    index.save(path)
+    return pregnancy, index, path
+
+
+def test_round_trip(saved):
+    pregnancy, index, path = saved
+    loaded = DayIndex.load(path)
+    assert loaded.key == index.key
+    for day in (0, 100, index.days - 1):
+        assert vars_of(loaded.entry(day)) == vars_of(index.entry(day))
+
+
+def vars_of(entry):
+    return {name: getattr(entry, name) for name in entry.__slots__}
+
+
+@pytest.mark.parametrize('keep', [0, HEADER.size - 1, HEADER.size + 6, HEADER.size + 1000, -1])
+def test_truncated_file_is_rejected(saved, keep):
+    pregnancy, index, path = saved
+    size = os.path.getsize(path)
+    with open(path, 'r+b') as f:
+        f.truncate(keep % size)
+    with pytest.raises(ValueError):
+        DayIndex.load(path)
+
+
+def test_bad_magic_is_rejected(saved):
+    pregnancy, index, path = saved
+    with open(path, 'r+b') as f:
+        f.write(b'NOTIDX')
+    with pytest.raises(ValueError):
+        DayIndex.load(path)
+
+
+def test_load_or_build_replaces_a_broken_file(saved):
+    pregnancy, index, path = saved
+    with open(path, 'r+b') as f:
+        f.truncate(HEADER.size + 6)
+    rebuilt = DayIndex.load_or_build(pregnancy, APPOINTMENTS, path)
+    assert rebuilt.key == index.key
+    assert DayIndex.load(path).key == index.key
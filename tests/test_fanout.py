@@ -0,0 +1,16 @@
+import json
+import logging
+
+from pregnancy_tracker.fanout import RenderPool
+from pregnancy_tracker.logs import event, setup_logging
+
+
+def test_worker_events_reach_stderr(capfd):
+    setup_logging()
+    pool = RenderPool([(264, 176)], max_workers=1)
+    try:
+        pool._executor.submit(event, 'from_worker', level=logging.WARNING).result()
+    finally:
+        pool.shutdown()
+    lines = [json.loads(line) for line in capfd.readouterr().err.splitlines()]
+    assert any(line.get('event') == 'from_worker' for line in lines)
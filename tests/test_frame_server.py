@@ -0,0 +1,61 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+from pregnancy_tracker.frame_server import FrameClient, FrameServer, FrameSource
+from pregnancy_tracker.panel import panel_size
+from pregnancy_tracker.profiles import Profile
+
+NAMES = ['default', 'twin a', 'Twin #1/2']
+
+
+@pytest.fixture(scope='module')
+def server():
+    profiles = [Profile(name, '2025-05-15') for name in NAMES]
+    width, height = panel_size('epd2in7_V2')
+    server = FrameServer(FrameSource(profiles, width, height), port=0)
+    server.start_background()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_profiles_are_listed(server):
+    assert FrameClient(server.url).profiles() == NAMES
+
+
+@pytest.mark.parametrize('name', NAMES)
+def test_frame_then_not_modified(server, name):
+    client = FrameClient(server.url)
+    changed, body = client.fetch(name, 0)
+    assert changed and len(body) == 176 * 264 // 8
+    # The same ETag again gets a 304 with no body; the client keeps its copy
+    assert client.fetch(name, 0) == (False, body)
+    assert client.not_modified == 1
+
+
+def test_stale_etag_gets_the_frame(server):
+    request = urllib.request.Request(f'{server.url}/frames/default/1',
+                                     headers={'If-None-Match': '"stale"'})
+    with urllib.request.urlopen(request) as response:
+        assert response.status == 200
+        assert response.headers['ETag'] != '"stale"'
+        assert response.read()
+
+
+def test_not_modified_has_empty_body(server):
+    with urllib.request.urlopen(f'{server.url}/frames/default/2') as response:
+        etag = response.headers['ETag']
+    request = urllib.request.Request(f'{server.url}/frames/default/2', headers={'If-None-Match': etag})
+    with pytest.raises(urllib.error.HTTPError) as e:
+        urllib.request.urlopen(request)
+    assert e.value.code == 304
+    assert e.value.read() == b''
+
+
+@pytest.mark.parametrize('profile, page', [('nobody', 0), ('default', 4)])
+def test_unknown_profile_or_page(server, profile, page):
+    with pytest.raises(urllib.error.HTTPError) as e:
+        FrameClient(server.url).fetch(profile, page)
+    assert e.value.code == 404
@@ -0,0 +1,18 @@
+import pytest
+
+from tests.golden import DATES, SIZES, case_name, cases, check_case, render
+
+CASES = list(cases())
+
+
+@pytest.mark.parametrize('case', CASES, ids=[case_name(*case) for case in CASES])
+def test_page_matches_golden(case):
+    name, passed, worst, detail = check_case(case, update=False)
+    assert passed, f"{name} (worst block {worst:.0%}): {detail}"
+
+
+@pytest.mark.parametrize('page', range(4))
+def test_every_date_changes_page(page):
+    """A date that renders like another one checks nothing new"""
+    frames = {render(SIZES[0], date, 'short', page).tobytes() for date in DATES}
+    assert len(frames) == len(DATES)
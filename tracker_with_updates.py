@@ -7,21 +7,20 @@ Simplified version that prioritizes reliability over features
 import subprocess
 import time
 import os
+import signal
 import sys
 import threading
 import logging
 
+from pregnancy_tracker.logs import setup_logging, event
+
 # Configuration
 UPDATE_CHECK_INTERVAL = 1800  # Check for updates every 30 minutes (in seconds)
 # Dynamically determine the repository directory
 REPO_DIR = os.path.dirname(os.path.abspath(__file__))
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='[%(asctime)s] %(levelname)s: %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+# Setup logging; main.py reuses this pipeline and applies log_level from config.json
+setup_logging('INFO')
 
 def run_main_tracker():
     """Run the main tracker program directly"""
@@ -36,7 +35,7 @@ def run_main_tracker():
         import main  # This will run the main tracker
         
     except Exception as e:
-        logging.error(f"Tracker error: {str(e)[:200]}")
+        event('tracker_error', level=logging.ERROR, error=str(e)[:200], exc_info=True)
         time.sleep(10)
         sys.exit(1)
 
@@ -58,6 +57,7 @@ def try_git_pull():
         )
         
         if result.returncode != 0:
+            event('update_fetch_failed', level=logging.DEBUG, returncode=result.returncode)
             return False
         
         # Check if there are updates
@@ -72,7 +72,7 @@ def try_git_pull():
         if result.returncode == 0:
             update_count = int(result.stdout.strip())
             if update_count > 0:
-                logging.info(f"Found {update_count} updates, pulling...")
+                event('update_found', commits=update_count)
                 
                 # Try to pull with timeout
                 result = subprocess.run(
@@ -84,13 +84,15 @@ def try_git_pull():
                 )
                 
                 if result.returncode == 0:
-                    logging.info("Updates pulled successfully, restarting...")
+                    event('update_pulled', commits=update_count)
                     return True
+                event('update_pull_failed', level=logging.WARNING, returncode=result.returncode,
+                      stderr=result.stderr[-200:])
         
         return False
         
     except Exception as e:
-        logging.debug(f"Update check failed: {e}")
+        event('update_check_failed', level=logging.DEBUG, error=str(e))
         return False
 
 def update_check_loop():
@@ -98,17 +100,22 @@ def update_check_loop():
     while True:
         time.sleep(UPDATE_CHECK_INTERVAL)
         try:
-            logging.info("Checking for updates...")
+            event('update_check')
             if try_git_pull():
-                # Exit so systemd can restart us with new code
+                # Exit so systemd can restart us with new code. SIGTERM lets
+                # main.py put the panel to sleep and save its state first
+                os.kill(os.getpid(), signal.SIGTERM)
+                time.sleep(30)
+                # Still here: the main thread is stuck, so don't wait for it
+                setup_logging().stop()
                 os._exit(0)
-        except:
-            pass  # Ignore all errors in update thread
+        except Exception:
+            # Keep the update thread alive whatever happens
+            logging.exception("Update thread error")
 
 if __name__ == "__main__":
     try:
-        logging.info("Starting pregnancy tracker with auto-updates...")
-        logging.info(f"Repository directory: {REPO_DIR}")
+        event('start', repo_dir=REPO_DIR)
         
         # Start the update checker in background (non-blocking)
         update_thread = threading.Thread(target=update_check_loop)